@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark utilities."""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+import timeit
+
+
+#------------------------------------------------------------------------------
+# Utility functions
+#------------------------------------------------------------------------------
+
+def _best_time(func, repeat=5):
+    """Return the best running time of a function, in seconds."""
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def run(namespace, repeat=5):
+    """Time all `bench_*` functions defined in a module namespace."""
+    names = sorted(name for name in namespace if name.startswith('bench_'))
+    for name in names:
+        t = _best_time(namespace[name], repeat=repeat)
+        print('{0:<40s} {1:10.2f} ms'.format(name, t * 1000))
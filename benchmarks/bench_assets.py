@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the conversions of notebooks with image outputs, with an
+asset store.
+
+Run with `python benchmarks/bench_assets.py`.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+import base64
+import json
+import os
+import os.path as op
+
+from ipymd.core.format_manager import convert
+from ipymd.utils.tempdir import TemporaryDirectory
+
+from _utils import _best_time
+
+
+#------------------------------------------------------------------------------
+# Documents
+#------------------------------------------------------------------------------
+
+def _notebook(n_cells, image_size):
+    """Notebook where every other cell repeats the image of the previous
+    one, like a plot displayed twice."""
+    def _image(i):
+        data = ('{0:08d}'.format(i // 2) * (image_size // 8)).encode('ascii')
+        return base64.b64encode(data).decode('ascii')
+    cells = [{'cell_type': 'code',
+              'execution_count': i + 1,
+              'metadata': {},
+              'source': ['plot({0})'.format(i)],
+              'outputs': [{'output_type': 'display_data',
+                           'metadata': {},
+                           'data': {'image/png': _image(i),
+                                    'text/plain': ['<Figure>']}}],
+              }
+             for i in range(n_cells)]
+    return {'nbformat': 4, 'nbformat_minor': 5, 'metadata': {},
+            'cells': cells}
+
+
+#------------------------------------------------------------------------------
+# Benchmarks
+#------------------------------------------------------------------------------
+
+def bench_assets(n_cells=200, image_size=100000):
+    with TemporaryDirectory() as tempdir:
+        path = op.join(tempdir, 'nb.ipynb')
+        with open(path, 'w') as f:
+            json.dump(_notebook(n_cells, image_size), f)
+        store = op.join(tempdir, 'assets')
+        kwargs = {'asset_store': store}
+
+        markdown = convert(path, 'notebook', 'markdown',
+                           from_kwargs=kwargs, to_kwargs=kwargs)
+        size = sum(op.getsize(op.join(store, name))
+                   for name in os.listdir(store))
+        print('{0:<24s} {1:8.1f} MB'.format('notebook',
+                                            op.getsize(path) / 1e6))
+        print('{0:<24s} {1:8.1f} kB'.format('markdown', len(markdown) / 1e3))
+        print('{0:<24s} {1:8.1f} MB ({2:d} files)'.format(
+            'assets', size / 1e6, len(os.listdir(store))))
+
+        # The assets are already in the store: nothing is written.
+        t = _best_time(lambda: convert(path, 'notebook', 'markdown',
+                                       from_kwargs=kwargs, to_kwargs=kwargs),
+                       repeat=3)
+        print('{0:<24s} {1:8.2f} ms'.format('notebook to markdown',
+                                            t * 1000))
+        t = _best_time(lambda: convert(markdown, 'markdown', 'notebook',
+                                       from_kwargs=kwargs,
+                                       to_kwargs=dict(kwargs,
+                                                      notebook_node=False)),
+                       repeat=3)
+        print('{0:<24s} {1:8.2f} ms'.format('markdown to notebook',
+                                            t * 1000))
+
+
+if __name__ == '__main__':
+    bench_assets()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the Atlas reader and writer.
+
+Run with `python benchmarks/bench_atlas.py`.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+from ipymd.formats.atlas import AtlasReader, AtlasWriter
+
+from _utils import run
+
+
+#------------------------------------------------------------------------------
+# Documents
+#------------------------------------------------------------------------------
+
+def _code(i):
+    return '\n'.join('x_{0} = some_function({1}, "argument")'.format(j, i)
+                     for j in range(10))
+
+
+# Book with thousands of code blocks.
+_BOOK = '\n\n'.join('Paragraph {0}.\n\n{1}'.format(
+                    i, AtlasReader.code_wrap.format(lang='python',
+                                                    code=_code(i)))
+                    for i in range(3000))
+
+_MARKDOWN = '\n'.join('Some equation $x_{0} = y$ and $$z_{0}$$.'.format(i)
+                      for i in range(20))
+
+
+#------------------------------------------------------------------------------
+# Benchmarks
+#------------------------------------------------------------------------------
+
+def bench_atlas_reader():
+    AtlasReader().read(_BOOK)
+
+
+def bench_atlas_writer():
+    writer = AtlasWriter()
+    for i in range(3000):
+        writer.append_markdown(_MARKDOWN)
+
+
+if __name__ == '__main__':
+    run(globals(), repeat=3)
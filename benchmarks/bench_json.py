@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the JSON backends on notebook files.
+
+Run with `python benchmarks/bench_json.py`.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+import os.path as op
+
+from ipymd.formats.notebook import NotebookWriter
+from ipymd.utils.tempdir import TemporaryDirectory
+from ipymd.utils.utils import _json_backend, _read_json, _write_json
+
+from _utils import _best_time
+
+
+#------------------------------------------------------------------------------
+# Documents
+#------------------------------------------------------------------------------
+
+def _notebook(n_cells=5000):
+    writer = NotebookWriter(validate='never', notebook_node=False)
+    code = '\n'.join('x_{0} = some_function({0}, "argument")'.format(i)
+                     for i in range(10))
+    for i in range(n_cells):
+        writer.write({'cell_type': 'markdown',
+                      'source': u'Paragraph {0}, with ünicode.'.format(i)})
+        writer.write({'cell_type': 'code', 'input': code,
+                      'output': 'output {0}'.format(i)})
+    return writer.contents
+
+
+#------------------------------------------------------------------------------
+# Benchmarks
+#------------------------------------------------------------------------------
+
+def bench_json(repeat=3):
+    nb = _notebook()
+    with TemporaryDirectory() as tempdir:
+        path = op.join(tempdir, 'test.ipynb')
+        for backend in ('json', 'ujson', 'orjson'):
+            try:
+                _json_backend(backend)
+            except ImportError:
+                print('{0:<8s} not installed'.format(backend))
+                continue
+            t_write = _best_time(lambda: _write_json(path, nb,
+                                                     backend=backend),
+                                 repeat=repeat)
+            t_read = _best_time(lambda: _read_json(path, backend=backend),
+                                repeat=repeat)
+            print('{0:<8s} write {1:8.2f} ms   read {2:8.2f} ms'.format(
+                  backend, t_write * 1000, t_read * 1000))
+
+
+if __name__ == '__main__':
+    bench_json()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the notebook reader on notebooks with heavy outputs.
+
+Run with `python benchmarks/bench_jsonstream.py`.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+import json
+import os.path as op
+import tracemalloc
+
+from ipymd.formats.notebook import NotebookReader
+from ipymd.utils.tempdir import TemporaryDirectory
+from ipymd.utils.utils import _read_json
+
+from _utils import _best_time
+
+
+#------------------------------------------------------------------------------
+# Documents
+#------------------------------------------------------------------------------
+
+def _notebook(n_cells, image_size):
+    image = 'iVBORw0KGgo' * (image_size // 11)
+    cells = [{'cell_type': 'code',
+              'execution_count': i + 1,
+              'metadata': {},
+              'source': ['plot({0})'.format(i)],
+              'outputs': [{'output_type': 'display_data',
+                           'metadata': {},
+                           'data': {'image/png': image,
+                                    'text/plain': ['<Figure>']}}],
+              }
+             for i in range(n_cells)]
+    return {'nbformat': 4, 'nbformat_minor': 5, 'metadata': {},
+            'cells': cells}
+
+
+def _log_notebook(n_cells, n_lines):
+    cells = [{'cell_type': 'code',
+              'execution_count': i + 1,
+              'metadata': {},
+              'source': ['run({0})'.format(i)],
+              'outputs': [{'output_type': 'stream',
+                           'name': 'stdout',
+                           'text': ['log line {0}\n'.format(j)
+                                    for j in range(n_lines)]}],
+              }
+             for i in range(n_cells)]
+    return {'nbformat': 4, 'nbformat_minor': 5, 'metadata': {},
+            'cells': cells}
+
+
+def _read(path):
+    list(NotebookReader().read(_read_json(path)))
+
+
+def _read_file(path):
+    list(NotebookReader().read_file(path))
+
+
+def _read_file_truncated(path):
+    list(NotebookReader(max_output_lines=100).read_file(path))
+
+
+def _peak_memory(func):
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+#------------------------------------------------------------------------------
+# Benchmarks
+#------------------------------------------------------------------------------
+
+def _bench(nb, funcs):
+    with TemporaryDirectory() as tempdir:
+        path = op.join(tempdir, 'heavy.ipynb')
+        with open(path, 'w') as f:
+            json.dump(nb, f, indent=1)
+        size = op.getsize(path) / 1e6
+        print('{0:.0f} MB notebook'.format(size))
+        for name, func in funcs:
+            t = _best_time(lambda: func(path), repeat=3)
+            peak = _peak_memory(lambda: func(path)) / 1e6
+            print('{0:<12s} {1:10.2f} ms {2:10.1f} MB peak'.format(
+                  name, t * 1000, peak))
+
+
+def bench_jsonstream(n_cells=200, image_size=250000):
+    _bench(_notebook(n_cells, image_size),
+           (('json.load', _read), ('read_file', _read_file)))
+
+
+def bench_output_limits(n_cells=10, n_lines=100000):
+    _bench(_log_notebook(n_cells, n_lines),
+           (('json.load', _read), ('read_file', _read_file),
+            ('truncated', _read_file_truncated)))
+
+
+if __name__ == '__main__':
+    bench_jsonstream()
+    bench_output_limits()
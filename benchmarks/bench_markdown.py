@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the Markdown block lexer.
+
+Run with `python benchmarks/bench_markdown.py`.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+from ipymd.formats.markdown import MarkdownReader
+from ipymd.lib.base_lexer import BaseRenderer
+from ipymd.lib.markdown import BlockLexer
+
+from _utils import run
+
+
+#------------------------------------------------------------------------------
+# Documents
+#------------------------------------------------------------------------------
+
+_LIST = '\n'.join('* Item {0}\n  continued\n  * Sub-item {0}'.format(i)
+                  for i in range(1000))
+
+_LOOSE_LIST = '\n\n'.join('{0}. Item {0}\n\n   Paragraph.'.format(i + 1)
+                          for i in range(1000))
+
+_TABLE = '\n'.join(['| a | b | c | d |',
+                    '|:--|:-:|--:|---|'] +
+                   ['| {0} | x | y | z |'.format(i) for i in range(2000)])
+
+_NPTABLE = '\n'.join(['a | b | c | d',
+                      ':-- | :-: | --: | ---'] +
+                     ['{0} | x | y | z'.format(i) for i in range(2000)])
+
+_SMALL_TABLES = '\n\n'.join('| a | b |\n|:--|--:|\n| 1 | 2 |'
+                            for i in range(500))
+
+
+# Typical notebook: no tables, no HTML, no footnotes, no metadata.
+_NOTEBOOK = '\n\n'.join(
+    '## Section {0}\n\n'
+    'Some *text* with `code` and a [link](http://ipython.org).\n'
+    'A second line of text.\n\n'
+    '* First item.\n'
+    '* Second item.\n\n'
+    '```python\n'
+    '>>> x = {0}\n'
+    '>>> print(x)\n'
+    '{0}\n'
+    '```'.format(i) for i in range(500))
+
+
+def _read(text, prune_rules=True):
+    lexer = BlockLexer(renderer=BaseRenderer(), prune_rules=prune_rules)
+    lexer.read(text)
+
+
+#------------------------------------------------------------------------------
+# Benchmarks
+#------------------------------------------------------------------------------
+
+def bench_list():
+    _read(_LIST)
+
+
+def bench_loose_list():
+    _read(_LOOSE_LIST)
+
+
+def bench_table():
+    _read(_TABLE)
+
+
+def bench_nptable():
+    _read(_NPTABLE)
+
+
+def bench_small_tables():
+    _read(_SMALL_TABLES)
+
+
+def bench_notebook():
+    _read(_NOTEBOOK)
+
+
+def bench_notebook_no_pruning():
+    _read(_NOTEBOOK, prune_rules=False)
+
+
+def bench_notebook_reader():
+    MarkdownReader().read(_NOTEBOOK)
+
+
+if __name__ == '__main__':
+    run(globals())
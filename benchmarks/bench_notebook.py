@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the notebook writer.
+
+Run with `python benchmarks/bench_notebook.py`.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+from ipymd.formats.notebook import NotebookWriter
+
+from _utils import run
+
+
+#------------------------------------------------------------------------------
+# Documents
+#------------------------------------------------------------------------------
+
+_CODE = '\n'.join('x_{0} = some_function({0}, "argument")'.format(i)
+                  for i in range(10))
+
+# Large notebook.
+_CELLS = [cell
+          for i in range(2000)
+          for cell in ({'cell_type': 'markdown',
+                        'source': 'Paragraph {0}.'.format(i)},
+                       {'cell_type': 'code', 'input': _CODE,
+                        'output': 'output {0}'.format(i)})]
+
+
+def _write(validate, n_contents=1, notebook_node=True):
+    writer = NotebookWriter(validate=validate, notebook_node=notebook_node)
+    for cell in _CELLS:
+        writer.write(cell)
+    for i in range(n_contents):
+        writer.contents
+
+
+#------------------------------------------------------------------------------
+# Benchmarks
+#------------------------------------------------------------------------------
+
+def bench_notebook_writer_always():
+    _write('always', n_contents=3)
+
+
+def bench_notebook_writer_once():
+    _write('once', n_contents=3)
+
+
+def bench_notebook_writer_sample():
+    _write('sample', n_contents=3)
+
+
+def bench_notebook_writer_never():
+    _write('never', n_contents=3)
+
+
+def bench_notebook_writer_dicts():
+    _write('never', n_contents=3, notebook_node=False)
+
+
+if __name__ == '__main__':
+    run(globals(), repeat=3)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the ODF reader.
+
+Run with `python benchmarks/bench_opendocument.py`.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+import os.path as op
+import tempfile
+
+from ipymd.core.format_manager import convert
+from ipymd.formats.markdown import MarkdownReader
+from ipymd.formats.opendocument import ODFReader
+from ipymd.lib.opendocument import (ODFDocument, ODFStream,
+                                    odf_to_markdown, load_odf, load_styles)
+
+from _utils import run
+
+
+#------------------------------------------------------------------------------
+# Documents
+#------------------------------------------------------------------------------
+
+def _cells(i):
+    markdown = ('# Section {0}\n\nSome *text* with `code` and **bold** '
+                'words {0}.\n\n* item 1\n* item 2\n\n1. one\n2. two'.format(i))
+    code = '\n'.join('x_{0} = some_function({1}, "argument")'.format(j, i)
+                     for j in range(10))
+    return [{'cell_type': 'markdown', 'source': markdown},
+            {'cell_type': 'code', 'input': code, 'output': 'out'}]
+
+
+# Document with a thousand sections.
+_CELLS = [cell for i in range(1000) for cell in _cells(i)]
+_DOCUMENT = convert(_CELLS, to='opendocument')
+_COPY = convert(_CELLS, to='opendocument')
+_PATH = op.join(tempfile.mkdtemp(), 'document.odt')
+_DOCUMENT.save(_PATH)
+_SAVE_PATH = op.join(op.dirname(_PATH), 'saved.odt')
+
+# Code block with 100,000 lines, half of them indented.
+_CODE = '\n'.join(('    ' if i % 2 else '') +
+                  'x_{0} = some_function({0},  "argument")'.format(i)
+                  for i in range(100000))
+
+
+#------------------------------------------------------------------------------
+# Benchmarks
+#------------------------------------------------------------------------------
+
+def bench_odf_reader():
+    ODFReader().read(_DOCUMENT)
+
+
+def bench_odf_reader_markdown():
+    # Former path: the whole document converted to Markdown and re-parsed.
+    MarkdownReader().read(odf_to_markdown(_DOCUMENT))
+
+
+def bench_odf_load():
+    ODFReader().read(load_odf(_PATH))
+
+
+def bench_odf_stream():
+    ODFReader().read(ODFStream(_PATH))
+
+
+def bench_odf_tree_equal():
+    assert _DOCUMENT.tree() == _COPY.tree()
+
+
+def bench_odf_hash_equal():
+    # Reset the cached hashes.
+    _DOCUMENT._hash = _COPY._hash = None
+    assert _DOCUMENT == _COPY
+
+
+def bench_odf_code():
+    ODFDocument().code(_CODE)
+
+
+def bench_odf_code_preformatted():
+    ODFDocument().code(_CODE, preformatted=True)
+
+
+def bench_odf_setup():
+    for i in range(100):
+        ODFDocument()
+
+
+def bench_odf_setup_template():
+    for i in range(100):
+        ODFDocument(styles=load_styles(_PATH))
+
+
+def bench_odf_save_odfpy():
+    _DOCUMENT._doc.save(_SAVE_PATH)
+
+
+def bench_odf_save():
+    _DOCUMENT.save(_SAVE_PATH)
+
+
+def bench_odf_save_stored():
+    _DOCUMENT.save(_SAVE_PATH, compresslevel=0, reuse_parts=True)
+
+
+def bench_odf_nested_lists():
+    # Outline with lists nested 300 levels deep.
+    doc = ODFDocument()
+    for i in range(300):
+        doc.start_list()
+        doc.start_list_item()
+        with doc.paragraph():
+            doc.text('Item {0}'.format(i))
+    for i in range(300):
+        doc.end_list_item()
+        doc.end_list()
+
+
+if __name__ == '__main__':
+    run(globals(), repeat=3)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the prompt managers.
+
+Run with `python benchmarks/bench_prompt.py`.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+from ipymd.core.prompt import IPythonPromptManager, PythonPromptManager
+from ipymd.formats.markdown import MarkdownReader
+
+from _utils import run
+
+
+#------------------------------------------------------------------------------
+# Documents
+#------------------------------------------------------------------------------
+
+def _code(n_lines):
+    return '\n'.join('x_{0} = some_function({0}, "argument")'.format(i)
+                     for i in range(n_lines))
+
+
+_INPUT = _code(200)
+_OUTPUT = '\n'.join('output line {0}'.format(i) for i in range(50))
+
+_PYTHON_CELL = PythonPromptManager().from_cell(_INPUT, _OUTPUT)
+_IPYTHON_CELL = IPythonPromptManager().from_cell(_INPUT, _OUTPUT)
+
+# Notebook with thousands of long code cells.
+_NOTEBOOK = '\n\n'.join('Cell {0}.\n\n```\n{1}\n```'.format(i, _PYTHON_CELL)
+                        for i in range(2000))
+
+
+#------------------------------------------------------------------------------
+# Benchmarks
+#------------------------------------------------------------------------------
+
+def bench_python_to_cell():
+    pm = PythonPromptManager()
+    for i in range(200):
+        pm.to_cell(_PYTHON_CELL)
+
+
+def bench_ipython_to_cell():
+    pm = IPythonPromptManager()
+    for i in range(200):
+        pm.to_cell(_IPYTHON_CELL)
+
+
+def bench_notebook_reader():
+    MarkdownReader().read(_NOTEBOOK)
+
+
+if __name__ == '__main__':
+    run(globals(), repeat=3)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the Python reader.
+
+Run with `python benchmarks/bench_python.py`.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+from ipymd.formats.python import PythonReader
+
+from _utils import run
+
+
+#------------------------------------------------------------------------------
+# Documents
+#------------------------------------------------------------------------------
+
+def _prose(i):
+    return '\n'.join('# This is line {0} of the paragraph {1}, with some '
+                     'words.'.format(j, i) for j in range(20))
+
+
+def _commented_code(i):
+    return '\n'.join('# x_{0} = some_function({1}, "argument")'.format(j, i)
+                     for j in range(20))
+
+
+def _code(i):
+    return '\n'.join('x_{0} = some_function({1}, "argument")'.format(j, i)
+                     for j in range(20))
+
+
+# Script with hundreds of long prose comment chunks.
+_SCRIPT = '\n\n'.join('{0}\n\n{1}\n\n{2}'.format(_prose(i),
+                                                 _commented_code(i),
+                                                 _code(i))
+                      for i in range(300))
+
+# The same chunks repeated, as when a script is re-read after a save.
+_REPEATED = '\n\n'.join('{0}\n\n{1}'.format(_prose(0), _code(0))
+                        for i in range(300))
+
+
+#------------------------------------------------------------------------------
+# Benchmarks
+#------------------------------------------------------------------------------
+
+def bench_python_reader():
+    list(PythonReader().read(_SCRIPT))
+
+
+def bench_python_reader_repeated():
+    list(PythonReader().read(_REPEATED))
+
+
+if __name__ == '__main__':
+    run(globals(), repeat=3)
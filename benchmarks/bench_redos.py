@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmarks of the Markdown lexers on pathological inputs.
+
+Every document is read at two sizes: the ratio of the running times should
+stay close to 2 (linear time).
+
+Run with `python benchmarks/bench_redos.py`.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+from functools import partial
+
+from ipymd.formats.markdown import MarkdownReader
+from ipymd.lib.base_lexer import BaseRenderer
+from ipymd.lib.markdown import BlockLexer, InlineLexer
+
+from _utils import _best_time
+
+
+#------------------------------------------------------------------------------
+# Documents
+#------------------------------------------------------------------------------
+
+_DOCUMENTS = {
+    'fence_whitespace': lambda n: '```\nx' + ' ' * (10 * n) + '\nyy',
+    'unclosed_fence': lambda n: '```\n' + 'x\n' * n,
+    'unclosed_fences': lambda n: '\n\n'.join('```%d' % i for i in range(n)),
+    'unclosed_html': lambda n: '\n'.join('<div>' for i in range(n)),
+    'list_whitespace': lambda n: '* a' + ' \n' * n + 'x',
+    'list_spaces': lambda n: '* a' + ' ' * (10 * n) + 'x',
+    'code_whitespace': lambda n: 'x `' + ' ' * (10 * n) + 'x',
+    'linebreak_whitespace': lambda n: 'x' + '  \n' * n + 'x',
+    'nested_quotes': lambda n: '>' * n + ' x',
+    'nested_lists': lambda n: '- ' * n,
+    'many_blocks': lambda n: 'a\n\n' * n,
+}
+
+
+def _block(text):
+    BlockLexer(renderer=BaseRenderer()).read(text)
+
+
+def _inline(text):
+    InlineLexer(renderer=BaseRenderer()).read(text)
+
+
+def _reader(text):
+    MarkdownReader().read(text)
+
+
+#------------------------------------------------------------------------------
+# Benchmarks
+#------------------------------------------------------------------------------
+
+def bench_redos(n=5000, repeat=3):
+    for name in sorted(_DOCUMENTS):
+        row = []
+        for func in (_block, _inline, _reader):
+            t0, t1 = (_best_time(partial(func, _DOCUMENTS[name](size)),
+                                 repeat=repeat)
+                      for size in (n, 2 * n))
+            row.append('{0:8.2f} ms (x{1:.1f})'.format(t1 * 1000,
+                                                       t1 / t0 if t0 else 0))
+        print('{0:<24s} {1}'.format(name, '  '.join(row)))
+
+
+if __name__ == '__main__':
+    print('{0:<24s} {1:<20s} {2:<20s} {3}'.format('', 'block', 'inline',
+                                                  'reader'))
+    bench_redos()
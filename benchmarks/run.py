@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark suite of the readers, writers and conversions.
+
+Every registered format is read and written, and every pair of formats is
+converted, for documents of several sizes. The best running time and the
+peak memory of every benchmark are saved as JSON, and can be compared to
+the results of another commit:
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --compare results.json --threshold 1.25
+
+The exit code is 1 if some benchmarks regressed by more than the threshold.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import os.path as op
+import platform
+import subprocess
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    tracemalloc = None
+
+from ipymd.core.format_manager import format_manager, convert
+from ipymd.utils.corpus import generate_cells
+
+from _utils import _best_time
+
+
+#------------------------------------------------------------------------------
+# Documents
+#------------------------------------------------------------------------------
+
+# Number of cells of the documents.
+SIZES = {'small': 20, 'medium': 400, 'huge': 10000}
+
+
+def _cells(size):
+    return generate_cells(SIZES[size], seed=0)
+
+
+#------------------------------------------------------------------------------
+# Measures
+#------------------------------------------------------------------------------
+
+def _peak_memory(func):
+    """Return the peak memory allocated by a function, in bytes."""
+    if tracemalloc is None:  # pragma: no cover
+        return None
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _benchmarks(formats, sizes):
+    """Yield the names and functions of the benchmarks."""
+    for size in sizes:
+        cells = _cells(size)
+        contents = {name: convert(cells, to=name) for name in formats}
+        for name in formats:
+            yield ('read/{0}/{1}'.format(name, size),
+                   lambda name=name: convert(contents[name], from_=name))
+            yield ('write/{0}/{1}'.format(name, size),
+                   lambda name=name: convert(cells, to=name))
+        for from_ in formats:
+            for to in formats:
+                if from_ != to:
+                    yield ('convert/{0}/{1}/{2}'.format(from_, to, size),
+                           lambda from_=from_, to=to: convert(
+                               contents[from_], from_=from_, to=to))
+
+
+def run_suite(formats=None, sizes=('small', 'medium'), repeat=3):
+    """Run the benchmarks and return a dictionary `{name: {'time': seconds,
+    'memory': bytes}}`."""
+    formats = sorted(formats or format_manager().formats)
+    results = {}
+    for name, func in _benchmarks(formats, sizes):
+        results[name] = {'time': _best_time(func, repeat=repeat),
+                         'memory': _peak_memory(func)}
+        print('{0:<48s} {1:10.2f} ms {2:10.0f} KB'.format(
+              name, results[name]['time'] * 1000,
+              (results[name]['memory'] or 0) / 1024.))
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                       cwd=op.dirname(op.abspath(__file__)),
+                                       ).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold=1.25, min_time=.001):
+    """Return the benchmarks slower, or using more memory, than the
+    baseline by more than a factor `threshold`, as a list of
+    `(name, measure, baseline, value)`. The benchmarks faster than
+    `min_time` seconds are too noisy to be timed."""
+    regressions = []
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        for measure in ('time', 'memory'):
+            value = results[name][measure]
+            reference = baseline[name][measure]
+            if not value or not reference:
+                continue
+            if measure == 'time' and reference < min_time:
+                continue
+            if value > reference * threshold:
+                regressions.append((name, measure, reference, value))
+    return regressions
+
+
+#------------------------------------------------------------------------------
+# Entry point
+#------------------------------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--formats',
+                        help='comma-separated formats, by default all')
+    parser.add_argument('--sizes', default='small,medium',
+                        help='comma-separated sizes among {0:s}'.format(
+                            ', '.join(sorted(SIZES))))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='JSON file of the results')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='JSON file of results to compare to')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='maximum ratio to the baseline')
+    args = parser.parse_args(argv)
+
+    formats = args.formats.split(',') if args.formats else None
+    results = run_suite(formats=formats, sizes=args.sizes.split(','),
+                        repeat=args.repeat)
+
+    if args.output:
+        dirname = op.dirname(args.output)
+        if dirname and not op.isdir(dirname):
+            os.makedirs(dirname)
+        with open(args.output, 'w') as f:
+            json.dump({'commit': _commit(),
+                       'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'python': platform.python_version(),
+                       'results': results,
+                       }, f, indent=1, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, threshold=args.threshold)
+        for name, measure, reference, value in regressions:
+            print('Regression of {0:s} {1:s}: {2:.4g} -> {3:.4g} '
+                  '(x{4:.2f})'.format(name, measure, reference, value,
+                                      value / reference))
+        if regressions:
+            return 1
+        print('No regression over x{0:.2f}.'.format(args.threshold))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -18,10 +18,10 @@ except ImportError:
     from IPython import nbformat
 
 try:
-    from traitlets import Unicode, Bool
+    from traitlets import Unicode, Bool, Dict
     from traitlets.config import Configurable
 except ImportError:
-    from IPython.utils.traitlets import Unicode, Bool
+    from IPython.utils.traitlets import Unicode, Bool, Dict
     from IPython.config.configurable import Configurable
 
 try:
@@ -31,6 +31,7 @@ except ImportError:
     from IPython.html.services.contents.filemanager import FileContentsManager
 
 from .format_manager import convert, format_manager
+from ..utils.assets import AssetStore
 from ipymd.ext.six.moves.urllib.error import HTTPError
 
 
@@ -54,6 +55,14 @@ class IPymdContentsManager(FileContentsManager, Configurable):
     # This will be passed to the FormatManager, overwriting any config there.
     verbose_metadata = Bool(False, config=True)
 
+    # Options of the notebook reader used when saving, like
+    # {'max_output_lines': 1000} to truncate the long outputs.
+    notebook_reader_options = Dict(config=True)
+
+    # Folder, relative to the notebooks, where the image and HTML outputs
+    # are saved when the format is markdown. They are not saved if blank.
+    asset_dir = Unicode(config=True)
+
     def __init__(self, *args, **kwargs):
         super(IPymdContentsManager, self).__init__(*args, **kwargs)
 
@@ -61,6 +70,14 @@ class IPymdContentsManager(FileContentsManager, Configurable):
         self._fm.default_kernel_name = self.default_kernel_name
         self._fm.verbose_metadata = self.verbose_metadata
 
+    def _asset_kwargs(self, os_path):
+        """Return the asset store option of the notebook reader and writer,
+        and of the Markdown reader and writer."""
+        if not self.asset_dir or self.format != 'markdown':
+            return {}
+        path = op.join(op.dirname(os_path), self.asset_dir)
+        return {'asset_store': AssetStore(path, url=self.asset_dir)}
+
     def get(self, path, content=True, type=None, format=None):
         """ Takes a path for an entity and returns its model
         Parameters
@@ -117,7 +134,10 @@ class IPymdContentsManager(FileContentsManager, Configurable):
                 if file_ext == '.ipynb':
                     return nbformat.read(f, as_version=as_version)
                 else:
-                    return convert(os_path, from_=self.format, to='notebook')
+                    asset_kwargs = self._asset_kwargs(os_path)
+                    return convert(os_path, from_=self.format, to='notebook',
+                                   from_kwargs=asset_kwargs,
+                                   to_kwargs=asset_kwargs)
 
             except Exception as e:
                 raise HTTPError(
@@ -149,9 +169,14 @@ class IPymdContentsManager(FileContentsManager, Configurable):
                     self._save_notebook(os_path, nb)
                 else:
 
+                    asset_kwargs = self._asset_kwargs(os_path)
+                    from_kwargs = dict(self.notebook_reader_options)
+                    from_kwargs.update(asset_kwargs)
                     contents = convert(model['content'],
                                        from_='notebook',
-                                       to=self.format)
+                                       to=self.format,
+                                       from_kwargs=from_kwargs,
+                                       to_kwargs=asset_kwargs)
 
                     # Save a text file.
                     if (format_manager().file_type(self.format) in
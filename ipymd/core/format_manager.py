@@ -109,7 +109,8 @@ class FormatManager(LoggingConfigurable):
         ----------
 
         reader : class
-            A class that implements read(contents) which yield ipymd cells.
+            A class that implements read(contents) which yield ipymd cells,
+            and optionally read_file(path) to read a file incrementally.
         writer : class
             A class that implements write(cell) and contents.
         file_extension : str
@@ -241,12 +242,6 @@ class FormatManager(LoggingConfigurable):
 
         """
 
-        # Load the file if 'contents_or_path' is a path.
-        if _is_path(contents_or_path):
-            contents = self.load(contents_or_path, from_)
-        else:
-            contents = contents_or_path
-
         if from_kwargs is None:
             from_kwargs = {}
         if to_kwargs is None:
@@ -260,13 +255,24 @@ class FormatManager(LoggingConfigurable):
             writer = (self.create_writer(to, **to_kwargs)
                       if to is not None else None)
 
-        if reader is not None:
-            # Convert from the source format to ipymd cells.
-            cells = [cell for cell in reader.read(contents)]
+        is_path = _is_path(contents_or_path)
+        if is_path and hasattr(reader, 'read_file'):
+            # The reader reads the file incrementally.
+            cells = [cell for cell in reader.read_file(contents_or_path)]
         else:
-            # If no reader is specified, 'contents' is assumed to already be
-            # a list of ipymd cells.
-            cells = contents
+            # Load the file if 'contents_or_path' is a path.
+            if is_path:
+                contents = self.load(contents_or_path, from_)
+            else:
+                contents = contents_or_path
+
+            if reader is not None:
+                # Convert from the source format to ipymd cells.
+                cells = [cell for cell in reader.read(contents)]
+            else:
+                # If no reader is specified, 'contents' is assumed to
+                # already be a list of ipymd cells.
+                cells = contents
 
         notebook_metadata = [cell for cell in cells
                              if cell["cell_type"] == "notebook_metadata"]
@@ -298,6 +304,11 @@ class FormatManager(LoggingConfigurable):
             # a list of ipymd cells.
             return cells
 
+    @property
+    def kernel_name(self):
+        """Name of the kernel of the notebooks without kernelspec."""
+        return self.default_kernel_name or self._km.kernel_name
+
     def clean_meta(self, meta):
         """Removes unwanted metadata
 
@@ -308,11 +319,8 @@ class FormatManager(LoggingConfigurable):
             Notebook metadata.
         """
         if not self.verbose_metadata:
-            default_kernel_name = (self.default_kernel_name or
-                                   self._km.kernel_name)
-
             if (meta.get("kernelspec", {})
-                    .get("name", None) == default_kernel_name):
+                    .get("name", None) == self.kernel_name):
                 del meta["kernelspec"]
                 meta.pop("language_info", None)
 
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+"""Cache of the outputs of the code cells.
+
+The outputs are saved when executed notebooks are read, and restored when
+notebooks are written, so that the notebooks with unchanged code do not
+need to be executed again. The outputs of a code cell are keyed by the
+kernel name and by the inputs of that cell and of all preceding code
+cells.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+import hashlib
+import os
+import os.path as op
+
+from ..ext.six import string_types
+from ..utils.utils import _read_json, _write_json
+
+
+#------------------------------------------------------------------------------
+# Output cache
+#------------------------------------------------------------------------------
+
+def _normalize_input(input):
+    """Remove the whitespace that does not survive the conversions."""
+    return '\n'.join(line.rstrip() for line in input.strip().splitlines())
+
+
+class OutputCache(object):
+    """Directory of the outputs of code cells, in JSON files.
+
+    `kernel_name` is the kernel of the notebooks without kernelspec, by
+    default the one of the format manager.
+
+    Example:
+
+        key = cache.kernel_key(nb['metadata'])
+        for cell in code_cells:
+            key = cache.key(key, cell['source'])
+            outputs = cache.get(key)
+
+    """
+    def __init__(self, path, kernel_name=None):
+        self.path = path
+        self._kernel_name = kernel_name
+
+    @property
+    def kernel_name(self):
+        if self._kernel_name is None:
+            from .format_manager import format_manager
+            self._kernel_name = format_manager().kernel_name
+        return self._kernel_name
+
+    def kernel_key(self, metadata):
+        """Return the key preceding the first code cell of a notebook."""
+        kernelspec = (metadata or {}).get('kernelspec') or {}
+        return kernelspec.get('name') or self.kernel_name
+
+    def key(self, previous, input):
+        """Return the key of a code cell from its input and the key of the
+        preceding code cell."""
+        text = previous + '\n' + _normalize_input(input)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return op.join(self.path, key + '.json')
+
+    def get(self, key):
+        """Return the outputs of a code cell, or None."""
+        path = self._path(key)
+        if not op.exists(path):
+            return None
+        return _read_json(path)
+
+    def put(self, key, outputs):
+        """Save the outputs of a code cell."""
+        if not op.isdir(self.path):
+            os.makedirs(self.path)
+        _write_json(self._path(key), outputs)
+
+
+def _output_cache(cache):
+    """Return an OutputCache from a cache, a directory path, or None."""
+    if isinstance(cache, string_types):
+        return OutputCache(cache)
+    return cache
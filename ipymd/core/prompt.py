@@ -14,7 +14,8 @@ import re
 #------------------------------------------------------------------------------
 
 def _to_lines(code):
-    return [line.rstrip() for line in code.rstrip().splitlines()]
+    # A code cell without output has `output=None`.
+    return [line.rstrip() for line in (code or '').rstrip().splitlines()]
 
 
 def _to_code(lines):
@@ -34,12 +35,34 @@ def _template_to_regex(template):
     return regex
 
 
+# Compiled prompt regexes, keyed by (regex, whether the regex matches the
+# lines not starting with the prompt).
+_prompt_regexes = {}
+
+
+def _compile_prompt_regex(regex, negate=False):
+    """Compile a prompt regex once.
+
+    With `negate=True`, the returned regex matches, in multiline mode, at
+    the start of the lines that do not start with the prompt.
+
+    """
+    key = (regex, negate)
+    compiled = _prompt_regexes.get(key)
+    if compiled is None:
+        if regex.startswith('^'):
+            regex = regex[1:]
+        if negate:
+            compiled = re.compile(r'^(?!(?:%s))' % regex, re.M)
+        else:
+            compiled = re.compile(r'(?:%s)' % regex)
+        _prompt_regexes[key] = compiled
+    return compiled
+
+
 def _starts_with_regex(line, regex):
     """Return whether a line starts with a regex or not."""
-    if not regex.startswith('^'):
-        regex = '^' + regex
-    reg = re.compile(regex)
-    return reg.match(line)
+    return _compile_prompt_regex(regex).match(line)
 
 
 class BasePromptManager(object):
@@ -59,6 +82,10 @@ class BasePromptManager(object):
         if not self.output_prompt_regex:
             self.output_prompt_regex = _template_to_regex(
                 self.output_prompt_template)
+        self._input_regex = _compile_prompt_regex(self.input_prompt_regex)
+        self._output_regex = _compile_prompt_regex(self.output_prompt_regex)
+        self._not_input_regex = _compile_prompt_regex(
+            self.input_prompt_regex, negate=True)
 
     def reset(self):
         self._number = 1
@@ -82,18 +109,16 @@ class BasePromptManager(object):
     def is_input(self, line):
         """Return whether a code line is an input, based on the input
         prompt."""
-        return _starts_with_regex(line, self.input_prompt_regex)
+        return self._input_regex.match(line)
 
     def split_input_output(self, text):
         """Split code into input lines and output lines, according to the
         input and output prompt templates."""
         lines = _to_lines(text)
-        i = 0
-        for line in lines:
-            if _starts_with_regex(line, self.input_prompt_regex):
-                i += 1
-            else:
-                break
+        # Search the first line not starting with the input prompt.
+        joined = '\n'.join(lines)
+        m = self._not_input_regex.search(joined)
+        i = joined.count('\n', 0, m.start()) if m else len(lines)
         return lines[:i], lines[i:]
 
     def from_cell(self, input, output):
@@ -167,14 +192,14 @@ class IPythonPromptManager(BasePromptManager):
     def to_cell(self, text):
         input_l, output_l = self.split_input_output(text)
 
-        m = _starts_with_regex(input_l[0], self.input_prompt_regex)
+        m = self._input_regex.match(input_l[0])
         assert m
         input_prompt = m.group(0)
         n_in = len(input_prompt)
         input_l = [line[n_in:] for line in input_l]
         input = _to_code(input_l)
 
-        m = _starts_with_regex(output_l[0], self.output_prompt_regex)
+        m = self._output_regex.match(output_l[0])
         assert m
         output_prompt = m.group(0)
         n_out = len(output_prompt)
@@ -225,7 +250,7 @@ class PythonPromptManager(SimplePromptManager):
                 if not lock:
                     prompt = first
 
-        return _to_code(lines_prompt) + '\n' + output.rstrip()
+        return _to_code(lines_prompt) + '\n' + (output or '').rstrip()
 
 
 def create_prompt(prompt):
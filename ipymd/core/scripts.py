@@ -93,6 +93,33 @@ def _filter_files_by_extension(files, extensions):
     return [file for file in files if _file_has_extension(file, extensions)]
 
 
+def _parse_value(value):
+    """Parse the value of a CLI option."""
+    lower = value.lower()
+    if lower in ('true', 'false'):
+        return lower == 'true'
+    elif lower == 'none':
+        return None
+    for type in (int, float):
+        try:
+            return type(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _parse_options(options):
+    """Parse a list of `key=value` CLI options into a dictionary."""
+    kwargs = {}
+    for option in options or []:
+        key, sep, value = option.partition('=')
+        if not sep or not key:
+            raise ValueError("Options should be like key=value: "
+                             "{0:s}.".format(option))
+        kwargs[key.strip().replace('-', '_')] = _parse_value(value.strip())
+    return kwargs
+
+
 def _load_file(file, from_):
     return format_manager().load(file, name=from_)
 
@@ -105,6 +132,10 @@ def _save_file(file, to, contents, overwrite=False):
 # Conversion functions
 #------------------------------------------------------------------------------
 
+# Formats whose readers and writers accept an asset store.
+_ASSET_FORMATS = ('markdown', 'notebook')
+
+
 def _converted_filename(file, from_, to):
     base, from_extension = op.splitext(file)
     to_extension = format_manager().file_extension(to)
@@ -186,12 +217,49 @@ def main():
                         help=('overwrite target file if it exists '
                               '(false by default)'))
 
+    parser.add_argument('--from-option', dest='from_options',
+                        action='append', metavar='KEY=VALUE',
+                        help=('option of the reader, like '
+                              'max_output_lines=1000 (can be repeated)'))
+
+    parser.add_argument('--to-option', dest='to_options',
+                        action='append', metavar='KEY=VALUE',
+                        help=('option of the writer, like '
+                              'validate=never (can be repeated)'))
+
+    parser.add_argument('--assets', dest='assets', metavar='DIR',
+                        help=('folder where the image and HTML outputs are '
+                              'saved, and restored from (markdown and '
+                              'notebook formats)'))
+
+    parser.add_argument('--output-cache', dest='output_cache', metavar='DIR',
+                        help=('folder where the outputs of the executed '
+                              'notebooks are saved, and restored from when '
+                              'converting to notebooks'))
+
     # Parse the CLI arguments.
     args = parser.parse_args()
+    from_kwargs = _parse_options(args.from_options)
+    to_kwargs = _parse_options(args.to_options)
+    # Notebooks are saved as JSON: no need for NotebookNode instances.
+    if args.to == 'notebook':
+        to_kwargs.setdefault('notebook_node', False)
+    if args.assets:
+        if args.from_ in _ASSET_FORMATS:
+            from_kwargs.setdefault('asset_store', args.assets)
+        if args.to in _ASSET_FORMATS:
+            to_kwargs.setdefault('asset_store', args.assets)
+    if args.output_cache:
+        if args.from_ == 'notebook':
+            from_kwargs.setdefault('output_cache', args.output_cache)
+        if args.to == 'notebook':
+            to_kwargs.setdefault('output_cache', args.output_cache)
     convert_files(args.files_or_dirs,
                   overwrite=args.overwrite,
                   from_=args.from_,
                   to=args.to,
+                  from_kwargs=from_kwargs,
+                  to_kwargs=to_kwargs,
                   extension=args.extension,
                   output_folder=args.output,
                   )
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""Test the output cache."""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+import json
+import os.path as op
+
+from ..format_manager import convert
+from ..output_cache import OutputCache
+from ...utils.tempdir import TemporaryDirectory
+
+
+#------------------------------------------------------------------------------
+# Tests
+#------------------------------------------------------------------------------
+
+def _notebook(inputs, kernel_name='python3'):
+    cells = [{'cell_type': 'code', 'source': input, 'metadata': {},
+              'execution_count': i + 1,
+              'outputs': [{'output_type': 'execute_result', 'metadata': {},
+                           'execution_count': i + 1,
+                           'data': {'text/plain': 'out %d' % i,
+                                    'text/html': '<b>%d</b>' % i}}]}
+             for i, input in enumerate(inputs)]
+    return {'nbformat': 4, 'nbformat_minor': 5, 'cells': cells,
+            'metadata': {'kernelspec': {'name': kernel_name}}}
+
+
+def test_output_cache_keys():
+    with TemporaryDirectory() as tempdir:
+        cache = OutputCache(tempdir, kernel_name='python3')
+        assert cache.kernel_key({}) == 'python3'
+        assert cache.kernel_key({'kernelspec': {'name': 'ir'}}) == 'ir'
+
+        key = cache.key('python3', 'a = 1')
+        assert cache.key('python3', 'a = 1  \n\n') == key
+        assert cache.key('ir', 'a = 1') != key
+        # The key depends on the preceding inputs.
+        assert cache.key(key, 'b = 2') != cache.key('python3', 'b = 2')
+
+        assert cache.get(key) is None
+        cache.put(key, [{'output_type': 'stream', 'text': 'x'}])
+        assert cache.get(key) == [{'output_type': 'stream', 'text': 'x'}]
+
+
+def test_output_cache_notebook():
+    inputs = ['a = 1', 'a + 1', 'a + 2']
+    nb = _notebook(inputs)
+    with TemporaryDirectory() as tempdir:
+        path = op.join(tempdir, 'nb.ipynb')
+        with open(path, 'w') as f:
+            json.dump(nb, f)
+        cache = OutputCache(op.join(tempdir, 'cache'), kernel_name='python3')
+
+        # The outputs are saved when reading the executed notebook.
+        markdown = convert(path, from_='notebook', to='markdown',
+                           from_kwargs={'output_cache': cache})
+
+        def _outputs(markdown):
+            nb = convert(markdown, from_='markdown', to='notebook',
+                         to_kwargs={'output_cache': cache,
+                                    'notebook_node': False})
+            return [cell['outputs'] for cell in nb['cells']]
+
+        # All outputs are restored, with the HTML ones.
+        assert _outputs(markdown) == [cell['outputs'] for cell in nb['cells']]
+
+        # The cells following a changed input are not restored.
+        outputs = _outputs(markdown.replace('a + 1', 'a + 3'))
+        assert outputs[0] == nb['cells'][0]['outputs']
+        assert [output[0]['data'] for output in outputs[1:]] == [
+            {'text/plain': 'out 1'}, {'text/plain': 'out 2'}]
+
+        # The streaming reader saves the same outputs.
+        other = OutputCache(op.join(tempdir, 'other'), kernel_name='python3')
+        list(convert(path, from_='notebook',
+                     from_kwargs={'output_cache': other}))
+        key = 'python3'
+        for input in inputs:
+            key = cache.key(key, input)
+            assert other.get(key) == cache.get(key)
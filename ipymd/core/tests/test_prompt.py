@@ -11,6 +11,7 @@ from ..prompt import (SimplePromptManager,
                       PythonPromptManager,
                       _template_to_regex,
                       _starts_with_regex,
+                      _compile_prompt_regex,
                       )
 from ...utils.utils import _show_outputs
 
@@ -32,6 +33,18 @@ def test_utils():
     assert _starts_with_regex('In [23]: print()\n', regex)
 
 
+def test_compile_prompt_regex():
+    regex = _compile_prompt_regex(r'>>>|\.\.\.')
+    assert _compile_prompt_regex(r'>>>|\.\.\.') is regex
+    assert regex.match('... x')
+    assert not regex.match('x >>>')
+
+    # The negated regex finds the lines not starting with the prompt.
+    regex = _compile_prompt_regex(r'>>>|\.\.\.', negate=True)
+    assert regex.search('>>> a\n... b\nc').start() == 12
+    assert not regex.search('>>> a\n... b')
+
+
 class MockPromptManager(SimplePromptManager):
     input_prompt_template = '> '
     output_prompt_template = ''
@@ -106,3 +119,10 @@ def test_python_prompt_manager():
     text = '>>> print("1")\n>>> print("2")\n>>> def f():\n...     pass\n1\n2'
 
     _test(PythonPromptManager, (input, output), text)
+
+
+def test_prompt_manager_no_output():
+    # The code cells read from scripts have no output.
+    for cls in (MockPromptManager, IPythonPromptManager, PythonPromptManager):
+        assert cls().from_cell('print("1")', None).rstrip() == \
+            cls().from_cell('print("1")', '').rstrip()
@@ -10,7 +10,9 @@ import os
 import os.path as op
 import shutil
 
-from ..scripts import convert_files, _common_root
+from pytest import raises
+
+from ..scripts import convert_files, _common_root, _parse_options
 from ...formats.tests._utils import _test_file_path
 from ...utils.tempdir import TemporaryDirectory
 
@@ -35,6 +37,19 @@ def test_common_root():
 # Test CLI conversion tool
 #------------------------------------------------------------------------------
 
+def test_parse_options():
+    assert _parse_options(None) == {}
+    assert _parse_options(['max-output-lines=10', 'a=1.5', 'b=true',
+                           'c=None', 'd=x=y']) == {'max_output_lines': 10,
+                                                   'a': 1.5,
+                                                   'b': True,
+                                                   'c': None,
+                                                   'd': 'x=y',
+                                                   }
+    with raises(ValueError):
+        _parse_options(['a'])
+
+
 def test_convert_files():
     basename = 'ex1'
     with TemporaryDirectory() as tempdir:
@@ -19,8 +19,8 @@ from ..utils.utils import _ensure_string
 #------------------------------------------------------------------------------
 
 class MyHTMLParser(HTMLParser):
-    def __init__(self, *args, **kwargs):
-        HTMLParser.__init__(self, *args, **kwargs)
+    def reset(self):
+        HTMLParser.reset(self)
         self.is_code = False
         self.is_math = False
         self.display = ''
@@ -44,10 +44,36 @@ class MyHTMLParser(HTMLParser):
             self.data += data
 
 
-def _get_html_contents(html):
+# Single <pre> or <span> element with plain attributes and text: the common
+# case, classified without the parser.
+_simple_element = re.compile(r'<(pre|span)((?:[ \t\n\r\f]+[a-zA-Z][-.:\w]*='
+                             r'"[^"<>&]*")*)[ \t\n\r\f]*>([^<&]*)</\1>$')
+_simple_attr = re.compile(r'([a-zA-Z][-.:\w]*)="([^"<>&]*)"')
+_data_type = re.compile(r'data-type', re.IGNORECASE)
+
+
+def _get_html_contents(html, parser=None):
     """Process a HTML block and detects whether it is a code block,
-    a math block, or a regular HTML block."""
-    parser = MyHTMLParser()
+    a math block, or a regular HTML block. `parser` is a MyHTMLParser
+    reused across the blocks of a document."""
+    # Neither code nor math without a data-type attribute.
+    if not _data_type.search(html):
+        return '', ''
+    m = _simple_element.match(html)
+    if m:
+        tag, attrs, data = m.groups()
+        attrs = [(name.lower(), value)
+                 for name, value in _simple_attr.findall(attrs)]
+        if tag == 'pre' and ('data-type', 'programlisting') in attrs:
+            return ('code', data.strip())
+        elif tag == 'span' and ('data-type', 'tex') in attrs:
+            return ('math', data.strip())
+        return '', ''
+    # Ambiguous markup: use the HTML parser.
+    if parser is None:
+        parser = MyHTMLParser()
+    else:
+        parser.reset()
     parser.feed(html)
     if parser.is_code:
         return ('code', parser.data.strip())
@@ -71,6 +97,12 @@ class AtlasReader(BaseMarkdownReader):
 
     math_wrap = '<span class="math-tex" data-type="tex">{equation}</span>'
 
+    def __init__(self):
+        super(AtlasReader, self).__init__()
+        # The HTML parser is not shared across readers, which may be used
+        # by several threads.
+        self._html_parser = MyHTMLParser()
+
     # Utility methods
     # -------------------------------------------------------------------------
 
@@ -92,7 +124,7 @@ class AtlasReader(BaseMarkdownReader):
     def parse_block_html(self, m):
         text = m.group(0).strip()
 
-        type, contents = _get_html_contents(text)
+        type, contents = _get_html_contents(text, self._html_parser)
         if type == 'code':
             return self._code_cell(contents)
         elif type == 'math':
@@ -123,14 +155,13 @@ class AtlasReader(BaseMarkdownReader):
 
 class AtlasWriter(BaseMarkdownWriter):
 
-    _math_regex = '''(?P<dollars>[\$]{1,2})([^\$]+)(?P=dollars)'''
+    _math_regex = re.compile(r'(?P<dollars>[\$]{1,2})([^\$]+)(?P=dollars)')
+    _math_repl = AtlasReader.math_wrap.format(equation=r'\\\\(\2\\\\)')
 
     def append_markdown(self, source, metadata=None):
         source = _ensure_string(source)
         # Wrap math equations.
-        source = re.sub(self._math_regex,
-                        AtlasReader.math_wrap.format(equation=r'\\\\(\2\\\\)'),
-                        source)
+        source = self._math_regex.sub(self._math_repl, source)
         # Write the processed Markdown.
         self._output.write(source.rstrip())
 
@@ -16,7 +16,8 @@ from collections import OrderedDict
 import yaml
 
 from ..ext.six import StringIO
-from ..utils.utils import _ensure_string, _preprocess
+from ..utils.assets import _asset_store, asset_mimetype
+from ..utils.utils import _ensure_string, _first_line, _preprocess
 from ..lib.markdown import (BlockGrammar, BlockLexer,
                             InlineGrammar, InlineLexer)
 from ..core.prompt import create_prompt
@@ -26,6 +27,14 @@ from ..core.prompt import create_prompt
 # Base Markdown
 #------------------------------------------------------------------------------
 
+class _MetaDumper(yaml.SafeDumper):
+    """Dump the metadata as YAML, including the NotebookNode instances of
+    the notebooks read with nbformat."""
+
+
+_MetaDumper.add_multi_representer(dict, yaml.SafeDumper.represent_dict)
+
+
 class BaseMarkdownReader(BlockLexer):
     def __init__(self):
         grammar = BlockGrammar()
@@ -35,6 +44,11 @@ class BaseMarkdownReader(BlockLexer):
         super(BaseMarkdownReader, self).__init__(grammar=grammar,
                                                  rules=rules)
 
+    def preprocess(self, text):
+        # Windows and old Mac line endings.
+        text = _preprocess(text, strip_lines=False)
+        return super(BaseMarkdownReader, self).preprocess(text)
+
     def parse_block_code(self, m):
         raise NotImplementedError("This method must be overriden.")
 
@@ -128,10 +142,11 @@ class BaseMarkdownWriter(object):
                 return ''
             return '---\n\n'
 
-        meta = '{}\n'.format(yaml.safe_dump(source,
-                                            explicit_start=True,
-                                            explicit_end=True,
-                                            default_flow_style=False))
+        meta = '{}\n'.format(yaml.dump(source,
+                                       Dumper=_MetaDumper,
+                                       explicit_start=True,
+                                       explicit_end=True,
+                                       default_flow_style=False))
 
         if is_notebook:
             # Replace the trailing `...\n\n`
@@ -172,13 +187,33 @@ class BaseMarkdownWriter(object):
 # Default Markdown
 #------------------------------------------------------------------------------
 
+# Reference to an output asset, in the paragraph following a code cell.
+_asset_link = re.compile(r'^!?\[output\]\(([^)\s]+)\)$')
+
+
+def _asset_links(store, names):
+    """Return the Markdown references to output assets: images or
+    links."""
+    return '\n'.join('{0}[output]({1})'.format(
+                     '!' if asset_mimetype(name).startswith('image/') else '',
+                     store.url(name))
+                     for name in names)
+
+
 class MarkdownReader(BaseMarkdownReader):
-    """Default Markdown reader."""
+    """Default Markdown reader.
+
+    With an `asset_store` (an `AssetStore` or a directory path), the
+    references to the store's assets following a code cell are added to
+    its `assets` list.
 
-    def __init__(self, prompt=None):
+    """
+
+    def __init__(self, prompt=None, asset_store=None):
         super(MarkdownReader, self).__init__()
         self._prompt = create_prompt(prompt)
         self._notebook_metadata = {}
+        self._assets = _asset_store(asset_store)
 
     def read(self, text, rules=None):
         raw_cells = super(MarkdownReader, self).read(text, rules)
@@ -190,11 +225,35 @@ class MarkdownReader(BaseMarkdownReader):
             if cell['cell_type'] == 'cell_metadata':
                 if i + 1 <= last_index:
                     raw_cells[i + 1].update(metadata=cell['metadata'])
+                continue
+            assets = self._asset_names(cell, cells[-1] if cells else None)
+            if assets:
+                cells[-1]['assets'] = assets
             else:
                 cells.append(cell)
 
         return cells
 
+    def _asset_names(self, cell, previous):
+        """Return the names of the assets referenced by a Markdown cell
+        following a code cell, or None if the cell is not made of asset
+        references only."""
+        if (self._assets is None or cell['cell_type'] != 'markdown' or
+                previous is None or previous['cell_type'] != 'code' or
+                'assets' in previous):
+            return None
+        source = cell['source']
+        if '[output](' not in source:
+            return None
+        names = []
+        for line in source.splitlines():
+            m = _asset_link.match(line.strip())
+            name = self._assets.name(m.group(1)) if m else None
+            if name is None:
+                return None
+            names.append(name)
+        return names
+
     # Helper functions to generate ipymd cells
     # -------------------------------------------------------------------------
 
@@ -215,7 +274,7 @@ class MarkdownReader(BaseMarkdownReader):
             return self._code_cell(code)
         else:
             # Test the first line of the cell.
-            first_line = code.splitlines()[0]
+            first_line = _first_line(code)
             if self._prompt.is_input(first_line):
                 return self._code_cell(code)
             else:
@@ -235,17 +294,29 @@ class MarkdownReader(BaseMarkdownReader):
 
 
 class MarkdownWriter(BaseMarkdownWriter):
-    """Default Markdown writer."""
+    """Default Markdown writer.
 
-    def __init__(self, prompt=None):
+    With an `asset_store` (an `AssetStore` or a directory path), the assets
+    of the code cells are referenced after them, as images or links.
+
+    """
+
+    def __init__(self, prompt=None, asset_store=None):
         super(MarkdownWriter, self).__init__()
         self._prompt = create_prompt(prompt)
+        self._assets = _asset_store(asset_store)
 
     def append_code(self, input, output=None, metadata=None):
         code = self._prompt.from_cell(input, output)
         wrapped = '```python\n{code}\n```'.format(code=code.rstrip())
         self._output.write(self.meta(metadata) + wrapped)
 
+    def write(self, cell):
+        super(MarkdownWriter, self).write(cell)
+        if self._assets is not None and cell.get('assets'):
+            self._output.write(_asset_links(self._assets, cell['assets']))
+            self._new_paragraph()
+
 
 MARKDOWN_FORMAT = dict(
     reader=MarkdownReader,
@@ -7,17 +7,14 @@
 #------------------------------------------------------------------------------
 
 import json
+import uuid
 
-try:
-    import nbformat as nbf
-    from nbformat.v4.nbbase import validate
-except ImportError:
-    import IPython.nbformat as nbf
-    from IPython.nbformat.v4.nbbase import validate
-
+from ..core.output_cache import _output_cache
 from ..lib.markdown import MarkdownFilter
 from ..lib.python import PythonFilter
 from ..ext.six import string_types
+from ..utils.assets import ASSET_MIMETYPES, _asset_store
+from ..utils.jsonstream import JSONStream
 from ..utils.utils import _ensure_string
 
 
@@ -30,8 +27,9 @@ def _cell_input(cell):
     return _ensure_string(cell.get('source', []))
 
 
-def _cell_output(cell):
-    """Return the output of an ipynb cell."""
+def _cell_output(cell, limits=None):
+    """Return the output of an ipynb cell, truncated to the `limits`
+    (an `_OutputLimits` instance) if any."""
     outputs = cell.get('outputs', [])
     # Add stdout.
     stdout = ('\n'.join(_ensure_string(output.get('text', ''))
@@ -45,7 +43,33 @@ def _cell_output(cell):
         if out.startswith('<matplotlib'):
             continue
         text_outputs.append(out)
-    return stdout + '\n'.join(text_outputs).rstrip()
+    output = stdout + '\n'.join(text_outputs).rstrip()
+    if limits is not None:
+        output = limits.truncate(output)
+    return output
+
+
+def _cell_assets(cell, store):
+    """Save the image and HTML outputs of an ipynb cell in an asset store,
+    and return the names of the assets."""
+    names = []
+    for output in cell.get('outputs', []):
+        data = output.get('data', {})
+        for mimetype in ASSET_MIMETYPES:
+            if mimetype in data:
+                names.append(store.put(mimetype, data[mimetype]))
+                break
+    return names
+
+
+def _nbformat():
+    """Import nbformat, which is only needed to validate notebooks and to
+    create NotebookNode instances."""
+    try:
+        import nbformat
+    except ImportError:
+        from IPython import nbformat
+    return nbformat
 
 
 def _compare_notebook_cells(cell_0, cell_1):
@@ -59,25 +83,266 @@ def _compare_notebooks(nb_0, nb_1):
                for cell_0, cell_1 in zip(nb_0['cells'], nb_1['cells']))
 
 
+#------------------------------------------------------------------------------
+# Validation
+#------------------------------------------------------------------------------
+
+_VALIDATE_MODES = ('always', 'once', 'never', 'sample')
+
+# Maximum number of cells validated in the 'sample' mode.
+_SAMPLE_SIZE = 20
+
+_validators = {}
+
+
+def _get_validator(nbformat_minor):
+    """Return a compiled nbformat v4 validator, or None if the installed
+    nbformat does not provide one."""
+    if nbformat_minor not in _validators:
+        try:
+            from nbformat.validator import get_validator
+            validator = get_validator(4, nbformat_minor,
+                                      name='fastjsonschema')
+        except (ImportError, TypeError, ValueError):
+            validator = None
+        _validators[nbformat_minor] = validator
+    return _validators[nbformat_minor]
+
+
+def _sample_cells(nb, size=_SAMPLE_SIZE):
+    """Return a shallow copy of a notebook with at most `size` cells,
+    evenly spaced."""
+    cells = nb['cells']
+    step = -(-len(cells) // size)
+    if step <= 1:
+        return nb
+    sample = nb.copy()
+    sample['cells'] = cells[::step]
+    return sample
+
+
+def _validate_notebook(nb):
+    """Validate a notebook against the nbformat v4 schema."""
+    validator = _get_validator(nb.get('nbformat_minor'))
+    if validator is not None:
+        validator.validate(nb)
+    else:
+        _nbformat().validate(nb)
+
+
+#------------------------------------------------------------------------------
+# Output limits
+#------------------------------------------------------------------------------
+
+# Last line of the truncated outputs.
+_OUTPUT_ELISION = '[... output truncated ...]'
+
+
+def _min(*values):
+    """Minimum of the values that are not None, or None."""
+    values = [value for value in values if value is not None]
+    return min(values) if values else None
+
+
+class _OutputLimits(object):
+    """Maximum number of lines and bytes of the outputs, per cell and per
+    notebook. None means no limit."""
+    def __init__(self, max_lines=None, max_bytes=None,
+                 max_notebook_lines=None, max_notebook_bytes=None):
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.max_notebook_lines = max_notebook_lines
+        self.max_notebook_bytes = max_notebook_bytes
+        self.reset()
+
+    def reset(self):
+        """Start a new notebook."""
+        self._notebook_lines = self.max_notebook_lines
+        self._notebook_bytes = self.max_notebook_bytes
+
+    @property
+    def enabled(self):
+        return any(limit is not None
+                   for limit in (self.max_lines, self.max_bytes,
+                                 self.max_notebook_lines,
+                                 self.max_notebook_bytes))
+
+    def cell_limits(self):
+        """Return the maximum number of lines and bytes of the next cell."""
+        return (_min(self.max_lines, self._notebook_lines),
+                _min(self.max_bytes, self._notebook_bytes))
+
+    def truncate(self, output):
+        """Truncate the output of a cell, and count it in the notebook."""
+        max_lines, max_bytes = self.cell_limits()
+        cut = len(output)
+        if max_lines is not None and output.count('\n') >= max_lines:
+            cut = -1
+            for i in range(max_lines):
+                cut = output.find('\n', cut + 1)
+            cut = max(cut, 0)
+        if max_bytes is not None and len(output) * 4 > max_bytes:
+            encoded = output[:cut].encode('utf-8')
+            if len(encoded) > max_bytes:
+                cut = len(encoded[:max_bytes].decode('utf-8', 'ignore'))
+        kept = output[:cut]
+        if self._notebook_lines is not None:
+            self._notebook_lines -= kept.count('\n') + 1 if kept else 0
+        if self._notebook_bytes is not None:
+            self._notebook_bytes -= len(kept.encode('utf-8'))
+        if cut < len(output):
+            return (kept + '\n' if kept else '') + _OUTPUT_ELISION
+        return output
+
+
+class _TextBound(object):
+    """Tell when enough pieces of the outputs of a cell have been read
+    to truncate them like `_cell_output()` does.
+
+    The pieces are joined with new lines, after being right-stripped. The
+    reading stops after a piece with contents beyond the limits, since the
+    output is then truncated before that piece.
+
+    """
+    def __init__(self, max_lines, max_bytes):
+        self._max_lines = max_lines
+        self._max_bytes = max_bytes
+        self._lines = 0
+        self._chars = 0
+        self.done = False
+
+    @property
+    def unlimited(self):
+        return self._max_lines is None and self._max_bytes is None
+
+    def add(self, piece):
+        stripped = piece.rstrip()
+        if stripped and ((self._max_lines is not None and
+                          self._lines >= self._max_lines) or
+                         (self._max_bytes is not None and
+                          self._chars >= self._max_bytes)):
+            self.done = True
+        self._lines += stripped.count('\n') + 1
+        self._chars += len(stripped) + 1
+
+
 #------------------------------------------------------------------------------
 # Notebook reader
 #------------------------------------------------------------------------------
 
+def _read_stream_text(stream, bound, is_data=False):
+    """Read an output text, a string or a list of lines, until the bound
+    is reached."""
+    if bound.unlimited:
+        return stream.read()
+    if bound.done:
+        stream.skip()
+        return ''
+    if stream.peek() != '[':
+        text = stream.read()
+        # HACK: <matplotlib ...> outputs are skipped by _cell_output().
+        if not (is_data and text.startswith('<matplotlib')):
+            bound.add(text)
+        return text
+    lines = []
+    values = stream.values()
+    for _ in values:
+        if bound.done:
+            # Skip the rest of the lines.
+            values.close()
+            break
+        elif is_data and lines and lines[0].startswith('<matplotlib'):
+            stream.skip()
+        else:
+            lines.append(stream.read())
+            if not (is_data and lines[0].startswith('<matplotlib')):
+                bound.add(lines[-1])
+    return lines
+
+
+def _read_stream_output(stream, bounds, mimetypes=()):
+    """Read the parts of an output used by `_cell_output()`, and the
+    data of the given MIME types."""
+    stdout_bound, data_bound = bounds
+    output = {}
+    for key in stream.items():
+        if key == 'text':
+            output[key] = _read_stream_text(stream, stdout_bound)
+        elif key == 'data':
+            output[key] = data = {}
+            for mimetype in stream.items():
+                if mimetype == 'text/plain':
+                    data[mimetype] = _read_stream_text(stream, data_bound,
+                                                       is_data=True)
+                elif mimetype in mimetypes:
+                    data[mimetype] = stream.read()
+                else:
+                    stream.skip()
+        else:
+            stream.skip()
+    return output
+
+
+def _read_stream_cell(stream, limits, mimetypes=(), full_outputs=False):
+    """Read a cell from a JSON stream, without the outputs that are not
+    plain text or of the given MIME types, nor the parts of the outputs
+    beyond the limits, unless `full_outputs` is True."""
+    max_lines, max_bytes = limits.cell_limits()
+    bounds = (_TextBound(max_lines, max_bytes),
+              _TextBound(max_lines, max_bytes))
+    cell = {}
+    for key in stream.items():
+        if key == 'outputs' and full_outputs:
+            cell[key] = stream.read()
+        elif key == 'outputs':
+            cell[key] = [_read_stream_output(stream, bounds, mimetypes)
+                         for _ in stream.values()]
+        elif key == 'attachments':
+            stream.skip()
+        else:
+            cell[key] = stream.read()
+    return cell
+
+
 class NotebookReader(object):
     """Reader for notebook cells.
 
-    nbformat v4 only."""
+    nbformat v4 only.
+
+    The text outputs of the code cells can be limited to a maximum number
+    of lines and bytes, per cell and for the whole notebook. The truncated
+    outputs end with an elision marker.
+
+    With an `asset_store` (an `AssetStore` or a directory path), the image
+    and HTML outputs are saved in the store, and the names of the assets
+    are in the `assets` list of the code cells.
+
+    With an `output_cache` (an `OutputCache` or a directory path), the
+    outputs of the executed code cells are saved in the cache.
+
+    """
 
     # Metadata that is basically never important enough to appear in text
     # formats.
     # TODO: expose this as configurable?
     ignore_meta = ["collapsed", "trusted", "celltoolbar"]
 
-    def __init__(self):
+    def __init__(self, max_output_lines=None, max_output_bytes=None,
+                 max_notebook_output_lines=None,
+                 max_notebook_output_bytes=None, asset_store=None,
+                 output_cache=None):
         self._notebook_metadata = {}
+        self._limits = _OutputLimits(max_output_lines, max_output_bytes,
+                                     max_notebook_output_lines,
+                                     max_notebook_output_bytes)
+        self._assets = _asset_store(asset_store)
+        self._cache = _output_cache(output_cache)
 
     def read(self, nb):
         assert nb['nbformat'] >= 4
+        self._limits.reset()
+        if self._cache is not None:
+            self._cache_outputs(nb['metadata'], nb['cells'])
 
         yield {
             'cell_type': 'notebook_metadata',
@@ -85,21 +350,84 @@ class NotebookReader(object):
         }
 
         for cell in nb['cells']:
-            ipymd_cell = {}
-            metadata = self.clean_meta(cell)
-            if metadata:
-                ipymd_cell['metadata'] = metadata
-            ctype = cell['cell_type']
-            ipymd_cell['cell_type'] = ctype
-            if ctype == 'code':
-                ipymd_cell['input'] = _cell_input(cell)
-                ipymd_cell['output'] = _cell_output(cell)
-            elif ctype == 'markdown':
-                ipymd_cell['source'] = _ensure_string(cell['source'])
-            else:
-                continue
+            ipymd_cell = self._read_cell(cell)
+            if ipymd_cell is not None:
+                yield ipymd_cell
+
+    def read_file(self, file):
+        """Read a notebook file incrementally.
+
+        The notebook is parsed cell by cell, and the outputs that are not
+        plain text (images, HTML, etc.) are skipped without being decoded,
+        unless they go to the asset store, as well as the text beyond the
+        output limits.
+
+        """
+        stream = JSONStream(file)
+        mimetypes = ASSET_MIMETYPES if self._assets is not None else ()
+        full_outputs = self._cache is not None
+        nb = {}
+        cells = []
+        # Code cells with their outputs, for the output cache.
+        code_cells = []
+        self._limits.reset()
+        try:
+            for key in stream.items():
+                if key == 'cells':
+                    for _ in stream.values():
+                        cell = _read_stream_cell(stream, self._limits,
+                                                 mimetypes, full_outputs)
+                        if full_outputs and cell['cell_type'] == 'code':
+                            code_cells.append(cell)
+                        ipymd_cell = self._read_cell(cell)
+                        if ipymd_cell is not None:
+                            cells.append(ipymd_cell)
+                else:
+                    nb[key] = stream.read()
+        finally:
+            stream.close()
+        if full_outputs:
+            # The metadata usually follows the cells.
+            self._cache_outputs(nb.get('metadata'), code_cells)
+        nb['cells'] = []
+        # The notebook metadata cell comes first.
+        for ipymd_cell in self.read(nb):
+            yield ipymd_cell
+        for ipymd_cell in cells:
             yield ipymd_cell
 
+    def _cache_outputs(self, metadata, cells):
+        """Save the outputs of the executed code cells in the cache."""
+        key = self._cache.kernel_key(metadata)
+        for cell in cells:
+            if cell['cell_type'] != 'code':
+                continue
+            key = self._cache.key(key, _cell_input(cell))
+            if cell.get('execution_count') is not None:
+                self._cache.put(key, cell.get('outputs', []))
+
+    def _read_cell(self, cell):
+        """Convert an ipynb cell into an ipymd cell, or return None."""
+        ipymd_cell = {}
+        metadata = self.clean_meta(cell)
+        if metadata:
+            ipymd_cell['metadata'] = metadata
+        ctype = cell['cell_type']
+        ipymd_cell['cell_type'] = ctype
+        if ctype == 'code':
+            ipymd_cell['input'] = _cell_input(cell)
+            ipymd_cell['output'] = _cell_output(cell, self._limits if
+                                                self._limits.enabled else None)
+            if self._assets is not None:
+                assets = _cell_assets(cell, self._assets)
+                if assets:
+                    ipymd_cell['assets'] = assets
+        elif ctype == 'markdown':
+            ipymd_cell['source'] = _ensure_string(cell['source'])
+        else:
+            return None
+        return ipymd_cell
+
     def clean_meta(self, cell):
         metadata = cell.get('metadata', {})
         for key in self.ignore_meta:
@@ -111,52 +439,162 @@ class NotebookReader(object):
 # Notebook writer
 #------------------------------------------------------------------------------
 
+# Version of the notebooks created by NotebookWriter. The minor version is
+# the one of the installed nbformat, as in nbformat.v4.new_notebook().
+_NBFORMAT = 4
+_nbformat_minor = None
+
+# Minor version from which the cells have an id.
+_CELL_ID_MINOR = 5
+
+
+def _get_nbformat_minor():
+    global _nbformat_minor
+    if _nbformat_minor is None:
+        _nbformat_minor = _nbformat().v4.nbformat_minor
+    return _nbformat_minor
+
+
+def _cell_id():
+    return uuid.uuid4().hex[:8]
+
+
 class NotebookWriter(object):
-    def __init__(self, keep_markdown=None, ipymd_skip=False):
-        self._nb = nbf.v4.new_notebook()
+    """Notebook writer.
+
+    The notebook is built with plain dictionaries following nbformat 4,
+    and converted to a NotebookNode in `contents`, unless
+    `notebook_node=False`. nbformat is then only imported for its version
+    and the validation. The cells have an id if the installed nbformat
+    supports nbformat 4.5 or later.
+
+    The `validate` option sets when the notebook is validated against the
+    nbformat schema:
+
+    * `always`: every time `contents` is accessed,
+    * `once`: the first time `contents` is accessed, and again only if
+      cells were written since,
+    * `never`: no validation,
+    * `sample`: like `once`, with a sample of the cells.
+
+    With an `asset_store` (an `AssetStore` or a directory path), the assets
+    of the code cells are restored as outputs.
+
+    With an `output_cache` (an `OutputCache` or a directory path), the
+    outputs of the code cells found in the cache replace the ones of the
+    ipymd cells.
+
+    """
+    def __init__(self, keep_markdown=None, ipymd_skip=False, validate='once',
+                 notebook_node=True, asset_store=None, output_cache=None):
+        if validate not in _VALIDATE_MODES:
+            raise ValueError("The validate option should be one of: " +
+                             ', '.join(_VALIDATE_MODES) + '.')
+        nbformat_minor = _get_nbformat_minor()
+        self._cell_ids = nbformat_minor >= _CELL_ID_MINOR
+        self._nb = {'nbformat': _NBFORMAT,
+                    'nbformat_minor': nbformat_minor,
+                    'metadata': {},
+                    'cells': [],
+                    }
         self._count = 1
+        self._validate = validate
+        self._notebook_node = notebook_node
+        self._assets = _asset_store(asset_store)
+        self._cache = _output_cache(output_cache)
+        # Key of the last code cell in the output cache.
+        self._cache_key = None
+        # Whether the notebook changed since the last access to `contents`.
+        self._changed = True
         self._markdown_filter = MarkdownFilter(keep_markdown)
         self._code_filter = PythonFilter(ipymd_skip=ipymd_skip)
 
+    def _new_cell(self, cell):
+        if self._cell_ids:
+            cell['id'] = _cell_id()
+        return cell
+
     def append_markdown(self, source, metadata=None):
         # Filter Markdown contents.
         source = self._markdown_filter(source)
         if not source:
             return
-        self._nb['cells'].append(
-            nbf.v4.new_markdown_cell(source,
-                                     metadata=metadata))
+        self._nb['cells'].append(self._new_cell({
+            'cell_type': 'markdown',
+            'source': source,
+            'metadata': metadata or {},
+        }))
+        self._changed = True
 
     def append_code(self, input, output=None, image=None, metadata=None):
+        """Append a code cell. `image` is a dictionary like
+        `{'image/png': base64_data}`, or a list of them."""
         input = self._code_filter(input)
-        cell = nbf.v4.new_code_cell(input,
-                                    execution_count=self._count,
-                                    metadata=metadata)
+        cell = self._new_cell({'cell_type': 'code',
+                               'metadata': metadata or {},
+                               'execution_count': self._count,
+                               'source': input,
+                               'outputs': [],
+                               })
         if output:
-            cell.outputs.append(nbf.v4.new_output('execute_result',
-                                {'text/plain': output},
-                                execution_count=self._count,
-                                metadata={},
-                                ))
-        if image:
-            # TODO
-            raise NotImplementedError("Output images not implemented yet.")
+            cell['outputs'].append({'output_type': 'execute_result',
+                                    'metadata': {},
+                                    'data': {'text/plain': output},
+                                    'execution_count': self._count,
+                                    })
+        if isinstance(image, dict):
+            image = [image]
+        for data in image or []:
+            cell['outputs'].append({'output_type': 'display_data',
+                                    'metadata': {},
+                                    'data': data,
+                                    })
+        if self._cache is not None:
+            self._restore_outputs(cell)
         self._nb['cells'].append(cell)
         self._count += 1
+        self._changed = True
+
+    def _restore_outputs(self, cell):
+        """Replace the outputs of a code cell by the cached ones."""
+        if self._cache_key is None:
+            self._cache_key = self._cache.kernel_key(self._nb['metadata'])
+        self._cache_key = self._cache.key(self._cache_key, cell['source'])
+        outputs = self._cache.get(self._cache_key)
+        if outputs is None:
+            return
+        for output in outputs:
+            if 'execution_count' in output:
+                output['execution_count'] = cell['execution_count']
+        cell['outputs'] = outputs
 
     def write_notebook_metadata(self, metadata):
-        self._nb.metadata.update(metadata)
+        self._nb['metadata'].update(metadata)
+        self._changed = True
 
     def write(self, cell):
         metadata = cell.get("metadata", {})
         if cell['cell_type'] == 'markdown':
             self.append_markdown(cell['source'], metadata=metadata)
         elif cell['cell_type'] == 'code':
-            self.append_code(cell['input'], cell['output'], metadata=metadata)
+            image = None
+            if self._assets is not None and cell.get('assets'):
+                image = [dict([self._assets.get(name)])
+                         for name in cell['assets']]
+            self.append_code(cell['input'], cell['output'], image=image,
+                             metadata=metadata)
 
     @property
     def contents(self):
-        validate(self._nb)
+        if self._validate == 'always' or (self._validate != 'never' and
+                                          self._changed):
+            if self._validate == 'sample':
+                _validate_notebook(_sample_cells(self._nb))
+            else:
+                _validate_notebook(self._nb)
+        if self._notebook_node and self._changed:
+            self._nb = _nbformat().from_dict(self._nb)
+        self._changed = False
         return self._nb
 
 
@@ -7,31 +7,173 @@
 # Imports
 # -----------------------------------------------------------------------------
 
+import re
+
 from ..core.prompt import create_prompt
 from ..lib.markdown import InlineLexer, BlockLexer, BaseRenderer
 from ..lib.opendocument import (ODFDocument, ODFRenderer,
-                                odf_to_markdown,
-                                load_odf, save_odf)
+                                ODFMarkdownConverter, _item_type,
+                                load_odf_stream, save_odf)
 from ..lib.python import PythonFilter
+from ..utils.utils import _first_line
 from .markdown import MarkdownReader
 
 
+# -----------------------------------------------------------------------------
+# ODF => cells converter
+# -----------------------------------------------------------------------------
+
+# Start of the blocks that MarkdownReader may not read as text: indented
+# code, fences, HTML and YAML metadata.
+_other_block = re.compile(r'[ `~<-]|\n\n-')
+
+
+def _text_blocks(text):
+    """Split Markdown text into blocks like the text rule of MarkdownReader,
+    or return None if some blocks may be read by another rule."""
+    if '\r' in text:
+        return None
+    blocks = []
+    pos, end = 0, len(text)
+    while pos < end:
+        if _other_block.match(text, pos):
+            return None
+        i = text.find('\n\n', pos + 1)
+        i = end if i < 0 else i + 2
+        blocks.append(text[pos:i].rstrip())
+        pos = i
+    return blocks
+
+
+class ODFCellConverter(ODFMarkdownConverter):
+    """Convert an ODF document into ipymd cells.
+
+    The top-level items are converted to Markdown one by one: the code
+    blocks become code cells, and the rest is split into Markdown cells,
+    as MarkdownReader would do with the Markdown of the whole document.
+    From the first item that is not plain text in Markdown, the rest of the
+    document is read by MarkdownReader.
+
+    """
+    def __init__(self, prompt=None):
+        super(ODFCellConverter, self).__init__()
+        self._prompt = create_prompt(prompt)
+        self._cells = []
+        # Whether the Markdown written so far ends with the end of a block.
+        self._at_block_end = True
+        # Whether the last block is a code block, which also ends with the
+        # following line breaks.
+        self._after_code = False
+        # Markdown of the rest of the document, once it is read by
+        # MarkdownReader.
+        self._rest = None
+
+    @property
+    def contents(self):
+        return self._cells
+
+    def read(self, doc):
+        self._doc = doc
+        for child in doc.items():
+            if self._rest is not None:
+                self._read_item(child)
+                continue
+            is_code = self._at_block_end and _item_type(child) == 'code'
+            self._read_item(child)
+            self._at_block_end = self._writer.ends_paragraph()
+            if self._at_block_end:
+                self._read_blocks(is_code)
+        if self._rest is None:
+            text = self._pop_contents().rstrip()
+            blocks = _text_blocks(text)
+            if blocks is not None:
+                self._cells.extend(self._markdown_cell(block)
+                                   for block in blocks)
+                return
+            self._rest = [text]
+        self._rest.append(self._writer.pop_contents())
+        reader = MarkdownReader(prompt=self._prompt)
+        self._cells.extend(reader.read(''.join(self._rest).rstrip() + '\n'))
+
+    def _markdown_cell(self, source):
+        return {'cell_type': 'markdown',
+                'source': source}
+
+    def _code_cell(self, source):
+        """Return the cell of a Markdown code block, as MarkdownReader."""
+        code = source[4:-4].rstrip()
+        if self._prompt.is_input(_first_line(code)):
+            input, output = self._prompt.to_cell(code)
+            return {'cell_type': 'code',
+                    'input': input,
+                    'output': output}
+        return self._markdown_cell(source)
+
+    def _pop_contents(self):
+        """Return the Markdown written since the end of the last block."""
+        text = self._writer.pop_contents()
+        if self._after_code:
+            text = text.lstrip('\r\n')
+            self._after_code = False
+        return text
+
+    def _read_blocks(self, is_code):
+        """Convert the Markdown written since the end of the last block,
+        which ends with the end of a block."""
+        text = self._pop_contents()
+        if is_code:
+            body = text[4:-6]
+            if (text.startswith('```\n') and text.endswith('\n```\n\n') and
+                    body.strip() and '```' not in body and '\r' not in body):
+                self._cells.append(self._code_cell(text.rstrip()))
+                self._after_code = True
+                return
+        else:
+            blocks = _text_blocks(text)
+            if blocks is not None:
+                self._cells.extend(self._markdown_cell(block)
+                                   for block in blocks)
+                return
+        # MarkdownReader reads the rest of the document.
+        self._rest = [text]
+
+
 # -----------------------------------------------------------------------------
 # ODF renderers
 # -----------------------------------------------------------------------------
 
 class ODFReader(object):
+    """Reader of ODF documents, without the Markdown of the whole
+    document."""
+    def __init__(self, prompt=None):
+        self._prompt = prompt
+
     def read(self, contents):
-        # contents is an ODFDocument.
-        md = odf_to_markdown(contents)
-        reader = MarkdownReader()
-        return reader.read(md)
+        # contents is an ODFDocument or an ODFStream.
+        converter = ODFCellConverter(prompt=self._prompt)
+        converter.read(contents)
+        return converter.contents
 
 
 class ODFWriter(object):
+    """Writer of ODF documents.
+
+    With `preformatted_code=True`, every line of the code cells is a single
+    span, which is faster to write but loses the runs of spaces in the
+    office suites.
+
+    `compresslevel` and `reuse_parts` are the save options of the document,
+    see `ODFDocument.save()`.
+
+    """
     def __init__(self, prompt=None, odf_doc=None,
-                 odf_renderer=None, ipymd_skip=False):
+                 odf_renderer=None, ipymd_skip=False,
+                 preformatted_code=False,
+                 compresslevel=None, reuse_parts=False):
         self._odf_doc = odf_doc or ODFDocument()
+        self._odf_doc.compresslevel = compresslevel
+        self._odf_doc.reuse_parts = reuse_parts
+        self._preformatted_code = preformatted_code
         if odf_renderer is None:
             odf_renderer = ODFRenderer
         self._prompt = create_prompt(prompt)
@@ -42,13 +184,16 @@ class ODFWriter(object):
     def write(self, cell):
         if cell['cell_type'] == 'markdown':
             md = cell['source']
-            # Convert the Markdown cell to ODF.
-            self._block_lexer.read(md)
+            # Convert the Markdown cell to ODF. Link and footnote
+            # definitions are scoped to the cell.
+            with self._block_lexer.document():
+                self._block_lexer.read(md)
         elif cell['cell_type'] == 'code':
             # Add the code cell to ODF.
             cell['input'] = self._code_filter(cell['input'])
             source = self._prompt.from_cell(cell['input'], cell['output'])
-            self._odf_doc.code(source)
+            self._odf_doc.code(source,
+                               preformatted=self._preformatted_code)
 
     @property
     def contents(self):
@@ -59,6 +204,6 @@ ODF_FORMAT = dict(
     reader=ODFReader,
     writer=ODFWriter,
     file_extension='.odt',
-    load=load_odf,
+    load=load_odf_stream,
     save=save_odf,
 )
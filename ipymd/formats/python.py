@@ -8,9 +8,11 @@
 
 import re
 import ast
+import hashlib
+import keyword
 from collections import OrderedDict
 
-from ..lib.base_lexer import BaseGrammar, BaseLexer
+from ..lib.base_lexer import BaseGrammar, BaseLexer, LazyPattern
 from ..lib.markdown import MarkdownFilter
 from ..lib.python import _is_python
 from ..ext.six import StringIO
@@ -30,13 +32,14 @@ class PythonSplitGrammar(BaseGrammar):
     _triple = _triple_quotes + '|' + _triple_doublequotes
 
     # '''text''' or """text""".
-    text_var = re.compile(r"^({0})((?!{0}).|\n)*?\1".format(_triple))
+    text_var = LazyPattern(r"^({0})((?!{0}).|\n)*?\1".format(_triple))
 
     # Two new lines followed by non-space
-    newline = re.compile(r'^[\n]{2,}(?=[^ ])')
+    newline = LazyPattern(r'^[\n]{2,}(?=[^ ])')
 
-    linebreak = re.compile(r'^\n+')
-    other = re.compile(r'^(?!{0}).'.format(_triple))
+    linebreak = LazyPattern(r'^\n+')
+    # Rest of the line, up to the next long string.
+    other = LazyPattern(r'^(?:(?!{0})[^\n])+'.format(_triple))
 
 
 class PythonSplitLexer(BaseLexer):
@@ -99,8 +102,46 @@ def _split_python(python):
     return lexer.chunks
 
 
+# Two names at the start of the first line: a syntax error, unless one of
+# them is a keyword (`x if y else z`, `print x`, `match x:`, etc.).
+_two_names = re.compile(r'([^\W\d]\w*)[ \t]+([^\W\d]\w*)', re.UNICODE)
+_soft_keywords = frozenset(keyword.kwlist) | frozenset(('print', 'exec',
+                                                        'async', 'await',
+                                                        'nonlocal', 'match',
+                                                        'case', 'type',
+                                                        'True', 'False',
+                                                        'None'))
+
+
+def _is_prose(source):
+    """Return whether a text is certainly not valid Python code."""
+    m = _two_names.match(source)
+    return bool(m) and not (m.group(1) in _soft_keywords or
+                            m.group(2) in _soft_keywords)
+
+
+# Decisions of _is_chunk_markdown(), keyed by the hash of the chunk.
+_chunk_cache = {}
+
+
+def _chunk_key(source):
+    if not isinstance(source, bytes):
+        source = source.encode('utf-8')
+    return hashlib.sha1(source).digest()
+
+
 def _is_chunk_markdown(source):
     """Return whether a chunk contains Markdown contents."""
+    key = _chunk_key(source)
+    is_markdown = _chunk_cache.get(key)
+    if is_markdown is None:
+        if len(_chunk_cache) >= 1024:
+            _chunk_cache.clear()
+        is_markdown = _chunk_cache[key] = _is_chunk_markdown_uncached(source)
+    return is_markdown
+
+
+def _is_chunk_markdown_uncached(source):
     lines = source.splitlines()
     if all(line.startswith('# ') for line in lines):
         # The chunk is a Markdown *unless* it is commented Python code.
@@ -109,8 +150,8 @@ def _is_chunk_markdown(source):
         if not source:
             return True
         # Try to parse the chunk: if it fails, it is Markdown, otherwise,
-        # it is Python.
-        return not _is_python(source)
+        # it is Python. Most prose is detected without parsing.
+        return _is_prose(source) or not _is_python(source)
     return False
 
 
@@ -6,16 +6,45 @@
 # Imports
 #------------------------------------------------------------------------------
 
+import sys
+import threading
+
 from ...core.format_manager import format_manager, convert
 from ...utils.utils import _remove_output, _diff, _show_outputs
 from ._utils import (_test_reader, _test_writer,
                      _exec_test_file, _read_test_file)
+from ..atlas import _get_html_contents, MyHTMLParser
 
 
 #------------------------------------------------------------------------------
 # Test Atlas parser
 #------------------------------------------------------------------------------
 
+def test_get_html_contents():
+    code = ('<pre data-code-language="python"\n'
+            '     data-type="programlisting">\n'
+            'x = 1\n'
+            '</pre>')
+    assert _get_html_contents(code) == ('code', 'x = 1')
+    # Markup handled by the HTML parser.
+    assert _get_html_contents(code.replace('x = 1', 'x &lt; 1')) == \
+        ('code', 'x < 1')
+    assert _get_html_contents('<div><pre data-type="programlisting">'
+                              'y</pre></div>') == ('code', 'y')
+    assert _get_html_contents(code.replace('pre', 'div')) == ('', '')
+
+    math = '<span class="math-tex" data-type="tex">\\(x\\)</span>'
+    assert _get_html_contents(math) == ('math', '\\(x\\)')
+    assert _get_html_contents('<div>\n<b>x</b></div>') == ('', '')
+
+    # The state of a reused parser is reset.
+    parser = MyHTMLParser()
+    assert _get_html_contents('<div><pre data-type="programlisting">'
+                              'y</pre></div>', parser) == ('code', 'y')
+    assert _get_html_contents('<div data-type="x">z</div>', parser) == \
+        ('', '')
+
+
 def _test_atlas_reader(basename):
     """Check that (test cells) and (test contents ==> cells) are the same."""
     converted, expected = _test_reader(basename, 'atlas')
@@ -55,3 +84,29 @@ def test_atlas_writer():
 def test_atlas_atlas():
     _test_atlas_atlas('ex1')
     _test_atlas_atlas('ex2')
+
+
+def test_atlas_reader_threads():
+    # Blocks read with the HTML parser.
+    contents = '\n\n'.join('<div><pre data-type="programlisting">x = {0}'
+                           '</pre></div>'.format(i) for i in range(500))
+    expected = convert(contents, from_='atlas')
+    results = []
+
+    def _convert():
+        results.append(convert(contents, from_='atlas'))
+
+    threads = [threading.Thread(target=_convert) for _ in range(4)]
+    # Switch threads as often as possible (Python 3).
+    interval = getattr(sys, 'getswitchinterval', lambda: None)()
+    if interval is not None:
+        sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        if interval is not None:
+            sys.setswitchinterval(interval)
+    assert results == [expected] * 4
@@ -6,7 +6,11 @@
 # Imports
 #------------------------------------------------------------------------------
 
+import os.path as op
+
 from ...core.format_manager import format_manager, convert
+from ...utils.assets import AssetStore
+from ...utils.tempdir import TemporaryDirectory
 from ...utils.utils import _diff, _show_outputs
 from ._utils import (_test_reader, _test_writer,
                      _exec_test_file, _read_test_file)
@@ -61,6 +65,17 @@ def test_markdown_markdown():
     _test_markdown_markdown('ex4')
 
 
+def test_markdown_notebook_node_metadata():
+    # The metadata of the notebooks read with nbformat are NotebookNode
+    # instances.
+    from nbformat import from_dict
+    nb = from_dict({'nbformat': 4, 'nbformat_minor': 0, 'metadata': {},
+                    'cells': [{'cell_type': 'markdown', 'source': 'Text',
+                               'metadata': {'tags': ['a']}}]})
+    contents = convert(nb, from_='notebook', to='markdown')
+    assert contents == '---\ntags:\n- a\n...\n\nText\n'
+
+
 def test_decorator():
     """Test a bug fix where empty '...' lines were added to the output."""
 
@@ -87,3 +102,24 @@ def test_decorator():
 
     markdown_bis = convert(cells, to='markdown')
     assert _diff(markdown, markdown_bis.replace('python', '')) == ''
+
+
+def test_markdown_assets():
+    with TemporaryDirectory() as tempdir:
+        store = AssetStore(op.join(tempdir, 'assets'), url='assets')
+        png = store.put('image/png', 'iVBORw==')
+        html = store.put('text/html', '<b>1</b>')
+        cells = [{'cell_type': 'code', 'input': 'plot()', 'output': '1',
+                  'assets': [png, html]},
+                 {'cell_type': 'markdown',
+                  'source': '![output](assets/0123456789abcdef.png)'}]
+
+        kwargs = {'asset_store': store}
+        markdown = convert(cells, to='markdown', to_kwargs=kwargs)
+        assert ('```\n\n![output](assets/{0})\n[output](assets/{1})\n\n'
+                .format(png, html)) in markdown
+
+        # The references to missing assets are kept as Markdown.
+        assert convert(markdown, from_='markdown', from_kwargs=kwargs) == cells
+        assert convert(markdown, from_='markdown')[1]['cell_type'] == \
+            'markdown'
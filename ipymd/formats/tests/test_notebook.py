@@ -7,10 +7,17 @@
 #------------------------------------------------------------------------------
 
 from ...core.format_manager import format_manager, convert
-from ..notebook import _compare_notebooks
+import json
+import os.path as op
+
+from pytest import raises
+
+from ..notebook import (_compare_notebooks, _sample_cells, _OUTPUT_ELISION,
+                        NotebookReader, NotebookWriter)
+from ...utils.tempdir import TemporaryDirectory
 from ...utils.utils import _diff, _show_outputs
 from ._utils import (_test_reader, _test_writer,
-                     _exec_test_file, _read_test_file)
+                     _exec_test_file, _read_test_file, _test_file_path)
 
 
 #------------------------------------------------------------------------------
@@ -56,3 +63,217 @@ def test_notebook_notebook():
     _test_notebook_notebook('ex1')
     _test_notebook_notebook('ex2')
     _test_notebook_notebook('ex3')
+
+
+def test_notebook_read_file():
+    for basename in ('ex1', 'ex2', 'ex3', 'ex4'):
+        path = _test_file_path(basename, 'notebook')
+        expected = list(NotebookReader().read(_read_test_file(basename,
+                                                              'notebook')))
+        assert list(NotebookReader().read_file(path)) == expected
+
+
+def test_notebook_read_file_outputs():
+    nb = {'nbformat': 4, 'nbformat_minor': 5, 'metadata': {},
+          'cells': [{'cell_type': 'code', 'source': ['x'],
+                     'metadata': {}, 'execution_count': 1,
+                     'attachments': {'a.png': {'image/png': 'iVBOR'}},
+                     'outputs': [{'output_type': 'display_data',
+                                  'metadata': {},
+                                  'data': {'image/png': 'iVBOR' * 1000,
+                                           'text/html': '<b>1</b>',
+                                           'text/plain': ['1']}},
+                                 {'output_type': 'stream', 'name': 'stdout',
+                                  'text': ['2\n']}]},
+                    {'cell_type': 'raw', 'source': '', 'metadata': {}}]}
+    with TemporaryDirectory() as tempdir:
+        path = op.join(tempdir, 'nb.ipynb')
+        with open(path, 'w') as f:
+            json.dump(nb, f)
+        cells = list(NotebookReader().read_file(path))
+        assert cells == list(NotebookReader().read(nb))
+        assert cells[1]['output'].strip() == '21'
+        assert convert(path, from_='notebook') == cells
+
+
+def test_notebook_reader_limits():
+    def _cell(n_lines):
+        return {'cell_type': 'code', 'source': 'x', 'metadata': {},
+                'execution_count': 1,
+                'outputs': [{'output_type': 'stream', 'name': 'stdout',
+                             'text': ['line %d\n' % i
+                                      for i in range(n_lines)]}]}
+
+    nb = {'nbformat': 4, 'nbformat_minor': 5, 'metadata': {},
+          'cells': [_cell(100), _cell(2), _cell(100)]}
+
+    def _outputs(**kwargs):
+        reader = NotebookReader(**kwargs)
+        cells = list(reader.read(nb))[1:]
+        with TemporaryDirectory() as tempdir:
+            path = op.join(tempdir, 'nb.ipynb')
+            with open(path, 'w') as f:
+                json.dump(nb, f)
+            # The streaming reader gives the same outputs.
+            assert list(reader.read_file(path))[1:] == cells
+        return [cell['output'] for cell in cells]
+
+    outputs = _outputs()
+    assert [len(output.splitlines()) for output in outputs] == [100, 2, 100]
+
+    outputs = _outputs(max_output_lines=10)
+    assert outputs[0] == '\n'.join(['line %d' % i for i in range(10)] +
+                                   [_OUTPUT_ELISION])
+    assert outputs[1] == 'line 0\nline 1'
+
+    outputs = _outputs(max_output_bytes=12)
+    assert outputs[0] == 'line 0\nline \n' + _OUTPUT_ELISION
+
+    # The notebook budget is shared by the cells.
+    outputs = _outputs(max_notebook_output_lines=101)
+    assert outputs[0] == '\n'.join(['line %d' % i for i in range(100)])
+    assert outputs[1] == 'line 0\n' + _OUTPUT_ELISION
+    assert outputs[2] == _OUTPUT_ELISION
+
+
+def test_notebook_assets():
+    nb = {'nbformat': 4, 'nbformat_minor': 5, 'metadata': {},
+          'cells': [{'cell_type': 'code', 'source': ['plot()'],
+                     'metadata': {}, 'execution_count': 1,
+                     'outputs': [{'output_type': 'display_data',
+                                  'metadata': {},
+                                  'data': {'image/png': 'iVBOR' * 100,
+                                           'text/html': '<b>1</b>',
+                                           'text/plain': ['1']}},
+                                 {'output_type': 'display_data',
+                                  'metadata': {},
+                                  'data': {'text/html': '<b>2</b>'}}]},
+                    {'cell_type': 'code', 'source': ['plot()'],
+                     'metadata': {}, 'execution_count': 2,
+                     'outputs': [{'output_type': 'display_data',
+                                  'metadata': {},
+                                  'data': {'image/png': 'iVBOR' * 100}}]}]}
+    with TemporaryDirectory() as tempdir:
+        path = op.join(tempdir, 'nb.ipynb')
+        with open(path, 'w') as f:
+            json.dump(nb, f)
+        store = op.join(tempdir, 'assets')
+        reader = NotebookReader(asset_store=store)
+        cells = list(reader.read(nb))
+        assert list(reader.read_file(path)) == cells
+        assert list(NotebookReader().read(nb))[1:] == [
+            {k: v for k, v in cell.items() if k != 'assets'}
+            for cell in cells[1:]]
+
+        # One asset per output, shared by the identical outputs.
+        png, html = cells[1]['assets']
+        assert png.endswith('.png') and html.endswith('.html')
+        assert cells[2]['assets'] == [png]
+
+        # The assets are restored as outputs.
+        writer = NotebookWriter(asset_store=store, notebook_node=False)
+        for cell in cells[1:]:
+            writer.write(cell)
+        outputs = writer.contents['cells'][0]['outputs']
+        assert [output['data'] for output in outputs] == [
+            {'text/plain': '1'},
+            {'image/png': 'iVBOR' * 100},
+            {'text/html': '<b>2</b>'}]
+
+
+def _nbformat_notebook(cells):
+    """Create a notebook with nbformat, as NotebookWriter used to."""
+    import nbformat as nbf
+    nb = nbf.v4.new_notebook()
+    count = 1
+    for cell in cells:
+        if cell['cell_type'] == 'markdown':
+            nb.cells.append(nbf.v4.new_markdown_cell(cell['source'],
+                                                     metadata={}))
+        else:
+            nb_cell = nbf.v4.new_code_cell(cell['input'],
+                                           execution_count=count,
+                                           metadata={})
+            if cell['output']:
+                nb_cell.outputs.append(nbf.v4.new_output(
+                    'execute_result', {'text/plain': cell['output']},
+                    execution_count=count, metadata={}))
+            nb.cells.append(nb_cell)
+            count += 1
+    return nb
+
+
+def _without_ids(nb):
+    nb = json.loads(json.dumps(nb))
+    for cell in nb['cells']:
+        cell.pop('id', None)
+    return nb
+
+
+def test_notebook_writer_dicts():
+    cells = [{'cell_type': 'markdown', 'source': '# Title'},
+             {'cell_type': 'code', 'input': 'x = 1', 'output': ''},
+             {'cell_type': 'code', 'input': 'x', 'output': '1'},
+             ]
+    expected = _without_ids(_nbformat_notebook(cells))
+
+    for notebook_node in (True, False):
+        writer = NotebookWriter(notebook_node=notebook_node)
+        for cell in cells:
+            writer.write(cell)
+        nb = writer.contents
+        assert hasattr(nb, 'cells') == notebook_node
+        assert _without_ids(nb) == expected
+
+
+def test_notebook_writer_version():
+    import nbformat
+    from .. import notebook
+    cell = {'cell_type': 'code', 'input': 'x', 'output': '1'}
+
+    writer = NotebookWriter()
+    writer.write(cell)
+    nb = writer.contents
+    assert nb['nbformat_minor'] == nbformat.v4.nbformat_minor
+    assert ('id' in nb['cells'][0]) == (nb['nbformat_minor'] >= 5)
+
+    # nbformat < 4.5 does not support cell ids.
+    minor = notebook._get_nbformat_minor()
+    notebook._nbformat_minor = 4
+    try:
+        writer = NotebookWriter()
+        writer.write(cell)
+        nb = writer.contents
+    finally:
+        notebook._nbformat_minor = minor
+    assert nb['nbformat_minor'] == 4
+    assert 'id' not in nb['cells'][0]
+
+
+def test_notebook_writer_validate():
+    for mode in ('always', 'once', 'never', 'sample'):
+        writer = NotebookWriter(validate=mode)
+        for i in range(50):
+            writer.write({'cell_type': 'markdown', 'source': 'Text.'})
+            writer.write({'cell_type': 'code', 'input': 'x = 1',
+                          'output': '1'})
+        assert len(writer.contents['cells']) == 100
+
+        # Invalid cell, written behind the writer's back.
+        writer.contents['cells'][0]['cell_type'] = 'unknown'
+        if mode == 'always':
+            with raises(Exception):
+                writer.contents
+        else:
+            writer.contents
+
+    with raises(ValueError):
+        NotebookWriter(validate='sometimes')
+
+
+def test_sample_cells():
+    nb = {'cells': list(range(100))}
+    sample = _sample_cells(nb, size=20)
+    assert sample['cells'] == list(range(0, 100, 5))
+    assert nb['cells'] == list(range(100))
+    assert _sample_cells(nb, size=200) is nb
@@ -7,6 +7,7 @@
 #------------------------------------------------------------------------------
 
 from ...core.format_manager import format_manager, convert
+from ...lib.opendocument import _first_difference
 from ...utils.utils import (_remove_output,
                             _remove_code_lang,
                             _remove_images,
@@ -70,7 +71,7 @@ def _test_odf_odf(basename):
     contents = _read_test_file(basename, 'opendocument')
     cells = convert(contents, from_='opendocument')
     converted = convert(cells, to='opendocument')
-    assert contents.tree() == converted.tree()
+    assert contents == converted, _first_difference(contents, converted)
 
 
 def test_odf_reader():
@@ -86,3 +87,24 @@ def test_odf_writer():
 def test_odf_odf():
     _test_odf_odf('ex1')
     _test_odf_odf('ex2')
+
+
+def test_odf_reader_markdown():
+    """Check that the ODF reader gives the same cells as the Markdown
+    reader on the converted document."""
+    from ..markdown import MarkdownReader
+    from ..opendocument import ODFReader
+    from ...lib.opendocument import odf_to_markdown
+
+    cells = [{'cell_type': 'markdown', 'source': '# Title\n\nSome *text*.'},
+             {'cell_type': 'code', 'input': 'x = 1\nprint(x)',
+              'output': '1'},
+             {'cell_type': 'markdown', 'source': '* item 1\n* item 2'},
+             {'cell_type': 'code', 'input': 'y = 2', 'output': ''},
+             {'cell_type': 'markdown', 'source': '> quote\n\nEnd.'},
+             ]
+    for contents in (convert(cells, to='opendocument'),
+                     _read_test_file('ex1', 'opendocument'),
+                     _read_test_file('ex2', 'opendocument')):
+        expected = MarkdownReader().read(odf_to_markdown(contents))
+        assert ODFReader().read(contents) == expected
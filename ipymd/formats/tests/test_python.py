@@ -10,7 +10,7 @@ from ...core.format_manager import format_manager, convert
 from ...utils.utils import _remove_output, _diff, _show_outputs
 from ._utils import (_test_reader, _test_writer,
                      _exec_test_file, _read_test_file)
-from ..python import _split_python
+from ..python import _split_python, _is_chunk_markdown, _is_prose
 
 
 #------------------------------------------------------------------------------
@@ -34,6 +34,26 @@ def test_split_python():
     chunks = _split_python(python)
     assert len(chunks) == 3
 
+    # Long lines and strings are kept together.
+    assert _split_python("a = 1  # x\n\ns = '''\n\n\nb'''\n") == \
+        ['a = 1  # x', "s = '''\n\n\nb'''"]
+
+
+def test_is_chunk_markdown():
+    assert _is_prose('Hello world')
+    assert _is_prose('Some text.\nx = 1')
+    assert not _is_prose('x = 1')
+    assert not _is_prose('print x')
+    assert not _is_prose('x if y else z')
+    assert not _is_prose('match x:\n    case 1: pass')
+
+    for i in range(2):  # the second time, from the cache
+        assert _is_chunk_markdown('# Hello world')
+        assert _is_chunk_markdown('# ## Header')
+        assert _is_chunk_markdown('# print(')
+        assert not _is_chunk_markdown('# x = 1\n# y = 2')
+        assert not _is_chunk_markdown('x = 1')
+
 
 def test_python_headers():
     cells = _exec_test_file('ex2')
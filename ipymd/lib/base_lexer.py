@@ -16,13 +16,152 @@ The code has been adapted from the mistune library:
 # Imports
 # -----------------------------------------------------------------------------
 
+import re
 from functools import partial
 
 
+# -----------------------------------------------------------------------------
+# Matching at a position
+# -----------------------------------------------------------------------------
+
+_ESCAPES_BEFORE = ('b', 'B', 'A')
+
+
+def _strip_start_anchors(pattern, flags=0):
+    """Return the pattern without the `^` anchors that stand at the start of
+    the match, or None if the pattern depends on what precedes the match.
+
+    `regex.match(text, pos)` with the returned pattern is then equivalent to
+    `regex.match(text[pos:])` with the original one.
+
+    """
+    verbose = flags & re.VERBOSE
+    out = []
+    # Whether the current position is necessarily the start of the match,
+    # and the same flag for each enclosing group.
+    at_start = True
+    stack = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '\\':
+            if pattern[i + 1:i + 2] in _ESCAPES_BEFORE:
+                return None
+            out.append(pattern[i:i + 2])
+            i += 2
+            at_start = False
+            continue
+        if c == '[':
+            # Skip the character class.
+            j = i + 1
+            if pattern[j:j + 1] == '^':
+                j += 1
+            if pattern[j:j + 1] == ']':
+                j += 1
+            while j < n and pattern[j] != ']':
+                j += 2 if pattern[j] == '\\' else 1
+            out.append(pattern[i:j + 1])
+            i = j + 1
+            at_start = False
+            continue
+        if verbose and c in ' \t\n\r\f\v':
+            out.append(c)
+            i += 1
+            continue
+        if verbose and c == '#':
+            j = pattern.find('\n', i)
+            j = n if j < 0 else j
+            out.append(pattern[i:j])
+            i = j
+            continue
+        if c == '(':
+            j = i + 1
+            if pattern[j:j + 1] == '?':
+                ext = pattern[j + 1:j + 2]
+                if ext == 'P' and pattern[j + 2:j + 3] == '<':
+                    j = pattern.index('>', j) + 1
+                elif ext in (':', '=', '!'):
+                    j += 2
+                else:
+                    # Lookbehinds, conditionals, inline flags, comments.
+                    return None
+            out.append(pattern[i:j])
+            stack.append(at_start)
+            i = j
+            continue
+        if c == '|':
+            at_start = stack[-1] if stack else True
+        elif c == ')':
+            stack.pop()
+            at_start = False
+        elif c == '^':
+            if not at_start:
+                return None
+            i += 1
+            continue
+        elif c != '$':
+            at_start = False
+        out.append(c)
+        i += 1
+    return ''.join(out)
+
+
+_positional_cache = {}
+
+
+def _positional(regex):
+    """Return a regex matching at a position like `regex` matches at the
+    start of a string, or None if there is no such regex."""
+    try:
+        return _positional_cache[regex]
+    except KeyError:
+        pass
+    pattern = _strip_start_anchors(regex.pattern, regex.flags)
+    if pattern is not None:
+        pattern = re.compile(pattern, regex.flags)
+    if len(_positional_cache) >= 256:
+        _positional_cache.clear()
+    _positional_cache[regex] = pattern
+    return pattern
+
+
+def _match_at(regex, text, pos=0, endpos=None):
+    """Match a regex at a given position of the text, as if the text had
+    been sliced at that position (and at `endpos`)."""
+    if endpos is None:
+        endpos = len(text)
+    if pos == 0:
+        return regex.match(text, 0, endpos)
+    positional = _positional(regex)
+    if positional is None:
+        return regex.match(text[pos:endpos])
+    return positional.match(text, pos, endpos)
+
+
 # -----------------------------------------------------------------------------
 # Base lexer
 # -----------------------------------------------------------------------------
 
+class LazyPattern(object):
+    """A grammar pattern compiled on first use.
+
+    The compiled regex is shared by all instances of the grammar class.
+
+    """
+    def __init__(self, pattern, flags=0):
+        self.pattern = pattern
+        self.flags = flags
+        self._regex = None
+
+    def compile(self):
+        if self._regex is None:
+            self._regex = re.compile(self.pattern, self.flags)
+        return self._regex
+
+    def __get__(self, instance, owner):
+        return self.compile()
+
+
 class BaseGrammar(object):
     pass
 
@@ -62,10 +201,13 @@ class BaseLexer(object):
         self.rules = rules
         self.renderer = renderer
 
-    def manipulate(self, text, rules):
+    def match_rule(self, key, text, pos=0):
+        """Match a rule at a position of the text."""
+        return _match_at(getattr(self.grammar, key), text, pos)
+
+    def manipulate(self, text, rules, pos=0):
         for key in rules:
-            rule = getattr(self.grammar, key)
-            m = rule.match(text)
+            m = self.match_rule(key, text, pos)
             if not m:
                 continue
             out = getattr(self, 'parse_%s' % key)(m)
@@ -80,15 +222,17 @@ class BaseLexer(object):
             rules = self.rules
         text = self.preprocess(text)
         tokens = []
-        while text:
-            m, out = self.manipulate(text, rules)
+        # The text is scanned in place: slicing off every token would make
+        # the lexer quadratic in the number of tokens.
+        pos, end = 0, len(text)
+        while pos < end:
+            m, out = self.manipulate(text, rules, pos)
             if out is None:
                 tokens.append(m)
             else:
                 tokens.append(out)
             if m is not False:
-                text = text[len(m.group(0)):]
+                pos += len(m.group(0))
                 continue
-            if text:
-                raise RuntimeError('Infinite loop at: %s' % text)
+            raise RuntimeError('Infinite loop at: %s' % text[pos:])
         return tokens
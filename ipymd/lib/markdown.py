@@ -18,8 +18,10 @@ The code has been adapted from the mistune library:
 # -----------------------------------------------------------------------------
 
 import re
+from collections import OrderedDict
+from contextlib import contextmanager
 
-from .base_lexer import BaseLexer, BaseRenderer
+from .base_lexer import BaseLexer, BaseRenderer, LazyPattern, _match_at
 from ..ext.six import StringIO, string_types
 
 
@@ -34,6 +36,15 @@ def _pure_pattern(regex):
     return pattern
 
 
+def _paragraph_pattern(fences, blocks):
+    """Return the pattern of a paragraph: text not immediately followed by
+    fences (a pattern with three groups) or another block."""
+    return r'^((?:[^\n]+\n?(?!%s|%s))+)\n*' % (fences, blocks)
+
+
+# Opening line of fences.
+_fences_open = r' *(`{3,}|~{3,}) *(\S+)? *\n'
+
 _key_pattern = re.compile(r'\s+')
 
 
@@ -41,93 +52,124 @@ def _keyify(key):
     return _key_pattern.sub(' ', key.lower())
 
 
+def _bounded_set(d, key, value, max_size=None):
+    """Set an item in an ordered dictionary, evicting the oldest items if
+    the dictionary holds more than `max_size` items."""
+    d[key] = value
+    if max_size is not None:
+        while len(d) > max_size:
+            d.popitem(last=False)
+
+
 _tag = (
     r'(?!(?:'
     r'a|em|strong|small|s|cite|q|dfn|abbr|data|time|code|'
     r'var|samp|kbd|sub|sup|i|b|u|mark|ruby|rt|rp|bdi|bdo|'
-    r'span|br|wbr|ins|del|img)\b)\w+(?!:/|[^\w\s@]*@)\b'
+    r'span|br|wbr|ins|del|img)(?!\w))\w+(?!:/|[^\w\s@]*@)(?!\w)'
 )
 
 
 class BlockGrammar(object):
     """Grammars for block level tokens."""
 
-    def_links = re.compile(
+    def_links = LazyPattern(
         r'^ *\[([^^\]]+)\]: *'  # [key]:
         r'<?([^\s>]+)>?'  # <link> or link
         r'(?: +["(]([^\n]+)[")])? *(?:\n+|$)'
         # r'(?:["(]([^\n]+)[")])? *(?:\n+|$)'
     )
-    def_footnotes = re.compile(
+    def_footnotes = LazyPattern(
         r'^\[\^([^\]]+)\]: *('
         r'[^\n]*(?:\n+|$)'  # [^key]:
         r'(?: {1,}[^\n]*(?:\n+|$))*'
         r')'
     )
 
-    newline = re.compile(r'^\n+')
-    block_code = re.compile(r'^( {4}[^\n]+\n*)+')
-    fences = re.compile(
+    newline = LazyPattern(r'^\n+')
+    block_code = LazyPattern(r'^( {4}[^\n]+\n*)+')
+    fences = LazyPattern(
         r'^ *(`{3,}|~{3,}) *(\S+)? *\n'  # ```lang
-        r'([\s\S]+?)\s*'
+        # The code ends with a non-space character, so that the closing
+        # whitespace is scanned once.
+        r'([\s\S](?:[\s\S]*?\S)??)\s*'
         r'\1 *(?:\n+|$)'  # ```
     )
-    hrule = re.compile(r'^ {0,3}[-*_](?: *[-*_]){2,} *(?:\n+|$)')
-    heading = re.compile(r'^ *(#{1,6}) *([^\n]+?) *#* *(?:\n+|$)')
-    lheading = re.compile(r'^([^\n]+)\n *(=|-)+ *(?:\n+|$)')
-    block_quote = re.compile(r'^( *>[^\n]+(\n[^\n]+)*\n*)+')
-    list_block = re.compile(
-        r'^( *)([*+-]|\d+\.) [\s\S]+?'
-        r'(?:'
-        r'\n+(?=\1?(?:[-*_] *){3,}(?:\n+|$))'  # hrule
-        r'|\n+(?=%s)'  # def links
-        r'|\n+(?=%s)'  # def footnotes
-        r'|\n{2,}'
-        r'(?! )'
-        r'(?!\1(?:[*+-]|\d+\.) )\n*'
-        r'|'
-        r'\s*$)' % (
-            _pure_pattern(def_links),
-            _pure_pattern(def_footnotes),
-        )
+    hrule = LazyPattern(r'^ {0,3}[-*_](?: *[-*_]){2,} *(?:\n+|$)')
+    heading = LazyPattern(r'^ *(#{1,6}) *([^\n]+?) *#* *(?:\n+|$)')
+    lheading = LazyPattern(r'^([^\n]+)\n *(=|-)+ *(?:\n+|$)')
+    block_quote = LazyPattern(r'^( *>[^\n]+(\n[^\n]+)*\n*)+')
+    list_block = LazyPattern(
+        r'^( *)([*+-]|\d+\.) '
+        # The trailing whitespace check is only done at the start of a run
+        # of whitespace, so that the run is not scanned from every line.
+        r'(?:%(unit)s(?:%(term)s|\s*$)'
+        r'|%(unit)s*?(?:\S(?:%(term)s|\s*$)|%(space)s%(term)s))' % {
+            'unit': r'(?:\S|[^\S\n]+(?![^\S\n])|\n)',
+            'space': r'(?:[^\S\n]+(?![^\S\n])|\n)',
+            'term': (
+                r'(?:'
+                r'\n+(?=\1?(?:[-*_] *){3,}(?:\n+|$))'  # hrule
+                r'|\n+(?=%s)'  # def links
+                r'|\n+(?=%s)'  # def footnotes
+                r'|\n{2,}'
+                r'(?! )'
+                r'(?!\1(?:[*+-]|\d+\.) )\n*'
+                r')' % (
+                    _pure_pattern(def_links),
+                    _pure_pattern(def_footnotes),
+                )
+            ),
+        }
     )
-    list_item = re.compile(
+    list_item = LazyPattern(
         r'^(( *)(?:[*+-]|\d+\.) [^\n]*'
         r'(?:\n(?!\2(?:[*+-]|\d+\.) )[^\n]*)*)',
         flags=re.M
     )
-    list_bullet = re.compile(r'^ *(?:[*+-]|\d+\.) +')
+    list_bullet = LazyPattern(r'^ *(?:[*+-]|\d+\.) +')
+    # Blocks other than the fences ending a paragraph.
+    _paragraph_blocks = '|'.join((
+        _pure_pattern(list_block).replace(r'\1', r'\3'),
+        _pure_pattern(hrule),
+        _pure_pattern(heading),
+        _pure_pattern(lheading),
+        _pure_pattern(block_quote),
+        _pure_pattern(def_links),
+        _pure_pattern(def_footnotes),
+        '<' + _tag,
+    ))
     # Paragraph = Text not immediately followed by another non-text block.
-    paragraph = re.compile(
-        r'^((?:[^\n]+\n?(?!'
-        r'%s|%s|%s|%s|%s|%s|%s|%s|%s'
-        r'))+)\n*' % (
-            _pure_pattern(fences).replace(r'\1', r'\2'),
-            _pure_pattern(list_block).replace(r'\1', r'\3'),
-            _pure_pattern(hrule),
-            _pure_pattern(heading),
-            _pure_pattern(lheading),
-            _pure_pattern(block_quote),
-            _pure_pattern(def_links),
-            _pure_pattern(def_footnotes),
-            '<' + _tag,
-        )
-    )
-    block_html = re.compile(
+    paragraph = LazyPattern(_paragraph_pattern(
+        _pure_pattern(fences).replace(r'\1', r'\2'), _paragraph_blocks))
+    # Paragraph ending before any opening line of fences, closed or not,
+    # and the blocks other than the fences ending a paragraph. The groups
+    # are numbered as in `paragraph`.
+    paragraph_fences_open = LazyPattern(_paragraph_pattern(
+        _fences_open + '()', _paragraph_blocks))
+    paragraph_end = LazyPattern(r'^()(?:(?!)()()()|%s)' % _paragraph_blocks)
+    block_html = LazyPattern(
         r'^ *(?:%s|%s|%s) *(?:\n{2,}|\s*$)' % (
             r'<!--[\s\S]*?-->',
             r'<(%s)[\s\S]+?<\/\1>' % _tag,
             r'''<%s(?:"[^"]*"|'[^']*'|[^'">])*?>''' % _tag,
         )
     )
-    table = re.compile(
+    # block_html for a tag known not to be closed: the group of the closed
+    # tag never matches.
+    block_html_single = LazyPattern(
+        r'^ *(?:%s|(?!)()|%s) *(?:\n{2,}|\s*$)' % (
+            r'<!--[\s\S]*?-->',
+            r'''<%s(?:"[^"]*"|'[^']*'|[^'">])*?>''' % _tag,
+        )
+    )
+    table = LazyPattern(
         r'^ *\|(.+)\n *\|( *[-:]+[-| :]*)\n((?: *\|.*(?:\n|$))*)\n*'
     )
-    nptable = re.compile(
+    nptable = LazyPattern(
         r'^ *(\S.*\|.*)\n *([-:]+ *\|[-| :]*)\n((?:.*\|.*(?:\n|$))*)\n*'
     )
-    text = re.compile(r'^[^\n]+')
-    meta = re.compile(
+    text = LazyPattern(r'^[^\n]+')
+    meta = LazyPattern(
         r'''(^|\n\n)
             (?P<sep_open>---)[ ]*  # open YAML stream
             (?P<alias>.+)?  # cell split, or !tag
@@ -136,6 +178,47 @@ class BlockGrammar(object):
             (?P<sep_close>(\.{3}|-{3}))  # close YAML stream
             )?(?:\n{2}|$)''', re.X)
 
+    # Helper patterns used by the block lexer handlers.
+    block_code_indent = LazyPattern(r'^ {4}', re.M)
+    block_quote_prefix = LazyPattern(r'^ *> ?', re.M)
+    list_loose = LazyPattern(r'\n\n(?!\s*$)')
+    table_trailing = LazyPattern(r'(?: *\| *)?\n$')
+    table_row_edges = LazyPattern(r'^ *\| *| *\| *$')
+    table_cell_sep = LazyPattern(r' *\| *')
+    table_header_edges = LazyPattern(r'^ *| *\| *$')
+    table_align_spaces = LazyPattern(r' *|\| *$')
+    table_align = LazyPattern(r'^ *(:?)-+(:?) *$')
+    nptable_trailing = LazyPattern(r'\n$')
+
+    # Openings of the blocks that need a closing. The whole opening line
+    # of the fences must be valid: a fence is then only unmatched when it
+    # has no closing.
+    fences_open = LazyPattern('^' + _fences_open)
+    block_html_open = LazyPattern(r'^ *<(%s)' % _tag)
+    block_html_comment_open = LazyPattern(r'^ *(<!--)')
+    # Paragraph with its lines, up to the end of the match.
+    paragraph_lines = LazyPattern(r'^([^\n]+(?:\n[^\n]+)*)\n*')
+
+    # Cache of the list item outdent patterns, keyed by indentation width.
+    _outdent_cache = {}
+
+    def outdent(self, space):
+        """Return a pattern matching up to `space` leading spaces."""
+        pattern = self._outdent_cache.get(space)
+        if pattern is None:
+            if len(self._outdent_cache) >= 64:
+                self._outdent_cache.clear()
+            pattern = re.compile(r'^ {1,%d}' % space, flags=re.M)
+            self._outdent_cache[space] = pattern
+        return pattern
+
+
+_table_align = {
+    ('', ':'): 'right',
+    (':', ':'): 'center',
+    (':', ''): 'left',
+}
+
 
 class BlockLexer(BaseLexer):
     """Block level lexer for block grammars."""
@@ -159,10 +242,156 @@ class BlockLexer(BaseLexer):
         'list_block', 'block_html', 'table', 'paragraph', 'text'
     )
 
-    def __init__(self, **kwargs):
+    # A rule can only match if the document contains at least one of
+    # its markers. Rules without markers are always tried.
+    rule_markers = {
+        'block_code': ('    ',),
+        'fences': ('```', '~~~'),
+        'meta': ('---',),
+        'heading': ('#',),
+        'nptable': ('|',),
+        'lheading': ('=', '-'),
+        'hrule': ('-', '*', '_'),
+        'block_quote': ('>',),
+        'list_block': ('*', '+', '-', '.'),
+        'block_html': ('<',),
+        'def_links': (']:',),
+        'def_footnotes': ('[^',),
+        'table': ('|',),
+    }
+
+    # Rules reading nested blocks.
+    nested_rules = ('block_quote', 'list_block', 'def_footnotes')
+
+    # Rules whose blocks need a closing: rule name -> (opening pattern,
+    # fallback rule when the opened block is known not to be closed) for
+    # every kind of block.
+    closed_rules = {
+        'fences': (('fences_open', None),),
+        'block_html': (('block_html_comment_open', None),
+                       ('block_html_open', 'block_html_single')),
+    }
+
+    def __init__(self, max_def_links=None, max_def_footnotes=None,
+                 prune_rules=True, max_depth=32, **kwargs):
         super(BlockLexer, self).__init__(**kwargs)
-        self.def_links = {}
-        self.def_footnotes = {}
+        # Maximum number of link and footnote definitions kept in memory.
+        self._max_def_links = max_def_links
+        self._max_def_footnotes = max_def_footnotes
+        self.def_links = OrderedDict()
+        self.def_footnotes = OrderedDict()
+        # Whether to drop the rules that cannot match in a document.
+        self._prune_rules = prune_rules
+        self._pruned_rules = frozenset()
+        # Maximum nesting level of quotes, lists and footnotes.
+        self._max_depth = max_depth
+        self._depth = 0
+        # For every text being read, the position of the first unclosed
+        # block of every kind.
+        self._unclosed = []
+
+    def reset(self):
+        """Forget the link and footnote definitions of the previous
+        documents."""
+        self.def_links.clear()
+        self.def_footnotes.clear()
+
+    @contextmanager
+    def document(self):
+        """Context manager scoping the link and footnote definitions to a
+        single document (or cell)."""
+        self.reset()
+        try:
+            yield self
+        finally:
+            self.reset()
+
+    def _prescan(self, text):
+        """Return the rules that cannot match anywhere in a document."""
+        pruned = set()
+        for key, markers in self.rule_markers.items():
+            # Only prune the rules using the default grammar patterns.
+            if (getattr(self.grammar, key, None) is not
+                    getattr(BlockGrammar, key)):
+                continue
+            if not any(marker in text for marker in markers):
+                pruned.add(key)
+        return frozenset(pruned)
+
+    def read(self, text, rules=None):
+        if rules is None:
+            rules = self.rules
+        # Nested reads (lists, quotes, footnotes) only see parts of the
+        # document, so the rules pruned for the whole document still apply.
+        if self._depth == 0:
+            self._pruned_rules = (self._prescan(text) if self._prune_rules
+                                  else frozenset())
+        if self._pruned_rules:
+            rules = [key for key in rules if key not in self._pruned_rules]
+        # Deeper blocks are read as text.
+        if self._max_depth is not None and self._depth >= self._max_depth:
+            rules = [key for key in rules if key not in self.nested_rules]
+        self._depth += 1
+        self._unclosed.append({})
+        try:
+            return super(BlockLexer, self).read(text, rules)
+        finally:
+            self._unclosed.pop()
+            self._depth -= 1
+
+    def _is_default(self, *keys):
+        return all(getattr(self.grammar, key) is getattr(BlockGrammar, key)
+                   for key in keys)
+
+    def _match_paragraph(self, text, pos):
+        """Match a paragraph, checking the fences following its lines with
+        the `fences` rule, which does not search for the closing of the
+        fences known not to be closed."""
+        match = super(BlockLexer, self).match_rule
+        start = pos
+        while True:
+            m = match('paragraph_fences_open', text, pos)
+            if not m:
+                return None
+            # Start of the line ending the paragraph, if any.
+            end = m.end(1) + 1
+            if (m.end() != end or end >= len(text) or
+                    match('paragraph_end', text, end) or
+                    self.match_rule('fences', text, end)):
+                break
+            # Fences not closed: the paragraph goes on.
+            pos = end
+        if pos == start:
+            return m
+        return _match_at(self.grammar.paragraph_lines, text, start, m.end())
+
+    def match_rule(self, key, text, pos=0):
+        if key == 'paragraph' and self._is_default('paragraph', 'fences'):
+            return self._match_paragraph(text, pos)
+        closed = self.closed_rules.get(key)
+        # Only guard the rules using the default grammar patterns.
+        if closed is None or not self._is_default(key):
+            return super(BlockLexer, self).match_rule(key, text, pos)
+        for opening, fallback in closed:
+            o = super(BlockLexer, self).match_rule(opening, text, pos)
+            if o:
+                break
+        else:
+            return super(BlockLexer, self).match_rule(key, text, pos)
+        # A block that is not closed after some position is not closed
+        # after any later position either: the closing is not searched for
+        # again until the end of the text.
+        unclosed = self._unclosed[-1]
+        name = (key, o.group(1))
+        if unclosed.get(name, pos + 1) <= pos:
+            if fallback is None:
+                return None
+            return super(BlockLexer, self).match_rule(fallback, text, pos)
+        m = super(BlockLexer, self).match_rule(key, text, pos)
+        # The fallback matches the blocks opened and not closed.
+        if not m or (fallback is not None and m.group(1) is None):
+            unclosed[name] = pos
+        return m
 
     def parse_newline(self, m):
         length = len(m.group(0))
@@ -170,9 +399,7 @@ class BlockLexer(BaseLexer):
             self.renderer.newline()
 
     def parse_block_code(self, m):
-        code = m.group(0)
-        pattern = re.compile(r'^ {4}', re.M)
-        code = pattern.sub('', code)
+        code = self.grammar.block_code_indent.sub('', m.group(0))
         self.renderer.block_code(code, lang=None)
 
     def parse_fences(self, m):
@@ -212,12 +439,11 @@ class BlockLexer(BaseLexer):
             # outdent
             if '\n ' in item:
                 space = space - len(item)
-                pattern = re.compile(r'^ {1,%d}' % space, flags=re.M)
-                item = pattern.sub('', item)
+                item = self.grammar.outdent(space).sub('', item)
 
             # determin whether item is loose or not
             loose = _next
-            if not loose and re.search(r'\n\n(?!\s*$)', item):
+            if not loose and self.grammar.list_loose.search(item):
                 loose = True
 
             rest = len(item)
@@ -237,18 +463,16 @@ class BlockLexer(BaseLexer):
 
     def parse_block_quote(self, m):
         self.renderer.block_quote_start()
-        cap = m.group(0)
-        pattern = re.compile(r'^ *> ?', flags=re.M)
-        cap = pattern.sub('', cap)
+        cap = self.grammar.block_quote_prefix.sub('', m.group(0))
         self.read(cap)
         self.renderer.block_quote_end()
 
     def parse_def_links(self, m):
         key = _keyify(m.group(1))
-        self.def_links[key] = {
+        _bounded_set(self.def_links, key, {
             'link': m.group(2),
             'title': m.group(3),
-        }
+        }, self._max_def_links)
 
     def parse_def_footnotes(self, m):
         key = _keyify(m.group(1))
@@ -256,7 +480,7 @@ class BlockLexer(BaseLexer):
             # footnote is already defined
             return
 
-        self.def_footnotes[key] = 0
+        _bounded_set(self.def_footnotes, key, 0, self._max_def_footnotes)
 
         self.renderer.footnote_start(key)
 
@@ -280,42 +504,42 @@ class BlockLexer(BaseLexer):
 
     def parse_table(self, m):
         item = self._process_table(m)
+        grammar = self.grammar
 
-        cells = re.sub(r'(?: *\| *)?\n$', '', m.group(3))
+        cells = grammar.table_trailing.sub('', m.group(3))
         cells = cells.split('\n')
+        row_edges = grammar.table_row_edges
+        split = grammar.table_cell_sep.split
         for i, v in enumerate(cells):
-            v = re.sub(r'^ *\| *| *\| *$', '', v)
-            cells[i] = re.split(r' *\| *', v)
+            cells[i] = split(row_edges.sub('', v))
 
         item['cells'] = cells
         self.renderer.table(item)
 
     def parse_nptable(self, m):
         item = self._process_table(m)
+        grammar = self.grammar
 
-        cells = re.sub(r'\n$', '', m.group(3))
+        cells = grammar.nptable_trailing.sub('', m.group(3))
         cells = cells.split('\n')
+        split = grammar.table_cell_sep.split
         for i, v in enumerate(cells):
-            cells[i] = re.split(r' *\| *', v)
+            cells[i] = split(v)
 
         item['cells'] = cells
         self.renderer.nptable(item)
 
     def _process_table(self, m):
-        header = re.sub(r'^ *| *\| *$', '', m.group(1))
-        header = re.split(r' *\| *', header)
-        align = re.sub(r' *|\| *$', '', m.group(2))
-        align = re.split(r' *\| *', align)
+        grammar = self.grammar
+        header = grammar.table_header_edges.sub('', m.group(1))
+        header = grammar.table_cell_sep.split(header)
+        align = grammar.table_align_spaces.sub('', m.group(2))
+        align = grammar.table_cell_sep.split(align)
 
         for i, v in enumerate(align):
-            if re.search(r'^ *-+: *$', v):
-                align[i] = 'right'
-            elif re.search(r'^ *:-+: *$', v):
-                align[i] = 'center'
-            elif re.search(r'^ *:-+ *$', v):
-                align[i] = 'left'
-            else:
-                align[i] = None
+            # One search for the right, center and left alignments.
+            a = grammar.table_align.search(v)
+            align[i] = _table_align.get(a.groups()) if a else None
 
         item = {
             'type': 'table',
@@ -355,51 +579,67 @@ class BlockLexer(BaseLexer):
 class InlineGrammar(object):
     """Grammars for inline level tokens."""
 
-    escape = re.compile(r'^\\([\\`*{}\[\]()#+\-.!_>~|])')  # \* \+ \! ....
-    tag = re.compile(
+    escape = LazyPattern(r'^\\([\\`*{}\[\]()#+\-.!_>~|])')  # \* \+ \! ....
+    tag = LazyPattern(
         r'^<!--[\s\S]*?-->|'  # comment
         r'^<\/\w+>|'  # close tag
         r'^<\w+[^>]*?>'  # open tag
     )
-    autolink = re.compile(r'^   <([^ >]+(@|:\/)[^ >]+)>')
-    link = re.compile(
+    autolink = LazyPattern(r'^   <([^ >]+(@|:\/)[^ >]+)>')
+    link = LazyPattern(
         r'^!?\[('
         r'(?:\[[^^\]]*\]|[^\[\]]|\](?=[^\[]*\]))*'
         r')\]\('
         r'''\s*<?([\s\S]*?)>?(?:\s+['"]([\s\S]*?)['"])?\s*'''
         r'\)'
     )
-    reflink = re.compile(
+    reflink = LazyPattern(
         r'^!?\[('
         r'(?:\[[^^\]]*\]|[^\[\]]|\](?=[^\[]*\]))*'
         r')\]\s*\[([^^\]]*)\]'
     )
-    nolink = re.compile(r'^!?\[((?:\[[^\]]*\]|[^\[\]])*)\]')
-    url = re.compile(r'''^(https?:\/\/[^\s<]+[^<.,:;"')\]\s])''')
-    double_emphasis = re.compile(
+    nolink = LazyPattern(r'^!?\[((?:\[[^\]]*\]|[^\[\]])*)\]')
+    url = LazyPattern(r'''^(https?:\/\/[^\s<]+[^<.,:;"')\]\s])''')
+    double_emphasis = LazyPattern(
         r'^_{2}(.+?)_{2}(?!_)'  # __word__
         r'|'
         r'^\*{2}(.+?)\*{2}(?!\*)'  # **word**
     )
-    emphasis = re.compile(
-        r'^\b_((?:__|.)+?)_\b'  # _word_
+    emphasis = LazyPattern(
+        r'^_((?:__|.)+?)_(?!\w)'  # _word_
         r'|'
         r'^\*((?:\*\*|.)+?)\*(?!\*)'  # *word*
     )
-    code = re.compile(r'^(`+)\s*(.*?[^`])\s*\1(?!`)')  # `code`
-    linebreak = re.compile(r'^ {2,}\n(?!\s*$)')
-    strikethrough = re.compile(r'^~~(?=\S)(.*?\S)~~')  # ~~word~~
-    footnote = re.compile(r'^\[\^([^\]]+)\]')
-    text = re.compile(r'^[\s\S]+?(?=[\\<!\[_*`~]|https?://| {2,}\n|$)')
+    code = LazyPattern(
+        # Whitespace runs are scanned once: the leading one is never
+        # backtracked into, except for a code span made of a single
+        # whitespace character.
+        r'^(`+)(?:\s*(?!\s)((?:[^ \n]| +(?! ))*?[^`])\s*\1(?!`)'
+        r'|\s*(\s)\1(?!`))'
+    )  # `code`
+    linebreak = LazyPattern(r'^ {2,}\n(?!\s*$)')
+    strikethrough = LazyPattern(r'^~~(?=\S)(.*?\S)~~')  # ~~word~~
+    footnote = LazyPattern(r'^\[\^([^\]]+)\]')
+    text = LazyPattern(
+        r'^[\s\S](?:[^ ]| +(?! ))*?(?=[\\<!\[_*`~]|https?://| {2,}\n|$)'
+    )
+
+    hard_wrap_linebreak = LazyPattern(r'^ *\n(?!\s*$)')
+    hard_wrap_text = LazyPattern(
+        r'^[\s\S](?:[^ ]| +(?! ))*?(?=[\\<!\[_*`~]|https?://| *\n|$)'
+    )
+
+    # The linebreak patterns without their `(?!\s*$)` lookahead, which the
+    # inline lexer checks without scanning the following whitespace.
+    linebreak_bare = LazyPattern(r'^ {2,}\n')
+    hard_wrap_linebreak_bare = LazyPattern(r'^ *\n')
 
     def hard_wrap(self):
         """Grammar for hard wrap linebreak. You don't need to add two
         spaces at the end of a line.
         """
-        self.linebreak = re.compile(r'^ *\n(?!\s*$)')
-        self.text = re.compile(
-            r'^[\s\S]+?(?=[\\<!\[_*`~]|https?://| *\n|$)'
-        )
+        self.linebreak = self.hard_wrap_linebreak
+        self.text = self.hard_wrap_text
 
     def __init__(self):
         self.hard_wrap()
@@ -427,8 +667,24 @@ class InlineLexer(BaseLexer):
     def read(self, text, rules=None):
         if self._in_footnote and 'footnote' in rules:
             rules.remove('footnote')
+        # Length of the text without its trailing whitespace.
+        self._text_end = len(text.rstrip())
         return super(InlineLexer, self).read(text, rules)
 
+    def match_rule(self, key, text, pos=0):
+        if key == 'linebreak':
+            regex = self.grammar.linebreak
+            if regex is InlineGrammar.linebreak:
+                bare = InlineGrammar.linebreak_bare
+            elif regex is InlineGrammar.hard_wrap_linebreak:
+                bare = InlineGrammar.hard_wrap_linebreak_bare
+            else:
+                bare = None
+            if bare is not None:
+                # A linebreak followed by whitespace only is not a linebreak.
+                return _match_at(bare, text, pos, self._text_end - 1)
+        return super(InlineLexer, self).match_rule(key, text, pos)
+
     def parse_escape(self, m):
         self.renderer.text(m.group(1))
 
@@ -504,7 +760,7 @@ class InlineLexer(BaseLexer):
         self.renderer.emphasis(text)
 
     def parse_code(self, m):
-        text = m.group(2)
+        text = m.group(2) or m.group(3)
         self.renderer.codespan(text)
 
     def parse_linebreak(self, m):
@@ -530,6 +786,8 @@ class MarkdownWriter(object):
         self._output = StringIO()
         self._list_number = 0
         self._in_quote = False
+        # Number of characters of the buffer returned by `pop_contents()`.
+        self._popped = 0
 
     # Buffer methods
     # -------------------------------------------------------------------------
@@ -538,6 +796,23 @@ class MarkdownWriter(object):
     def contents(self):
         return self._output.getvalue().rstrip() + '\n'  # end of file \n
 
+    def ends_paragraph(self):
+        """Return whether the contents end with exactly one blank line."""
+        text = self._output.getvalue()
+        return text.endswith('\n\n') and not text.endswith('\n\n\n')
+
+    def pop_contents(self):
+        """Return the contents written since the last call, and remove them
+        from the buffer. The end of the last line is kept in the buffer,
+        since it matters to the next contents."""
+        text = self._output.getvalue()
+        popped = text[self._popped:]
+        kept = text[max(len(text.rstrip('\n')) - 1, 0):]
+        self._output = StringIO()
+        self._output.write(kept)
+        self._popped = len(kept)
+        return popped
+
     def close(self):
         self._output.close()
 
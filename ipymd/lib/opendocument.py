@@ -7,16 +7,28 @@
 # Imports
 # -----------------------------------------------------------------------------
 
+import hashlib
+import io
+import json
 import os
 import os.path as op
 import re
+import sys
+import time
+import zipfile
 from contextlib import contextmanager
 from pprint import pprint
+from xml.etree.ElementTree import iterparse
 
 try:
     import odf
 except ImportError:
     raise ImportError("The odfpy library is required.")
+from odf.namespaces import (nsdict, CHARTNS, DRAWNS, OFFICENS,
+                            PRESENTATIONNS, STYLENS, TABLENS, TEXTNS)
+from odf.element import Element, IllegalChild, Text
+from odf.manifest import Manifest, FileEntry
+from odf.office import AutomaticStyles, DocumentContent
 from odf.opendocument import OpenDocument, OpenDocumentText, load
 from odf.style import (Style,
                        TextProperties,
@@ -27,6 +39,7 @@ from odf.text import (H, P, S, Span, LineBreak, List, ListItem,
                       ListStyle, ListLevelStyleNumber)
 
 from ..ext.six import text_type, string_types
+from ..ext.six.moves import zip_longest
 from .base_lexer import BaseRenderer
 from .markdown import BaseRenderer, InlineLexer, MarkdownWriter, BlockLexer
 
@@ -71,28 +84,55 @@ def _is_paragraph(el):
     return el.tagName == 'text:p'
 
 
+def _add_to_container(parent, el):
+    """Add an element to a container which is not in the document yet.
+
+    `addElement()` sets the owner document of the whole subtree every time,
+    which is quadratic with nested containers: it is set once, when the
+    outermost container is added to the document.
+
+    """
+    if parent.ownerDocument is not None:
+        parent.addElement(el)
+        return
+    if (parent.allowed_children is not None and
+            el.qname not in parent.allowed_children):
+        raise IllegalChild("<%s> is not allowed in <%s>" % (el.tagName,
+                                                            parent.tagName))
+    parent.appendChild(el)
+
+
+def _container_kind(el):
+    """Return 'paragraph', 'list-item', or None for other containers."""
+    if el.qname == (TEXTNS, u'p'):
+        return 'paragraph'
+    elif el.qname == (TEXTNS, u'list-item'):
+        return 'list-item'
+    return None
+
+
 def _is_normal_text(item):
     return (item['tag'] == 'span' and
             item.get('style', 'normal-text') == 'normal-text')
 
 
+def _iter_merged_text(children):
+    """Iterate over items, merging the consecutive normal text items."""
+    previous = None
+    for child in children:
+        if (previous is not None and _is_normal_text(child) and
+                _is_normal_text(previous)):
+            child['text'] = previous['text'] + child['text']
+        elif previous is not None:
+            yield previous
+        previous = child
+    if previous is not None:
+        yield previous
+
+
 def _merge_text(*children):
-    children = list(children)
-    if not children:
-        return children
-    head, tail = children[0:1], children[1:]
-    if _is_normal_text(head[0]):
-        if not tail:
-            return head
-        else:
-            merged = _merge_text(*tail)
-            if _is_normal_text(merged[0]):
-                merged[0]['text'] = head[0]['text'] + merged[0]['text']
-                return merged
-            else:
-                return head + merged
-    else:
-        return head + _merge_text(*tail)
+    """Merge the consecutive normal text items."""
+    return list(_iter_merged_text(children))
 
 
 def _is_empty(el):
@@ -101,6 +141,73 @@ def _is_empty(el):
     return False
 
 
+def _items_hash(items):
+    """Return a hash of the structure and the contents of ODF items."""
+    h = hashlib.sha1()
+    for item in items:
+        h.update(json.dumps(item, sort_keys=True).encode('ascii'))
+        h.update(b'\n')
+    return h.hexdigest()
+
+
+def _first_difference(doc_0, doc_1):
+    """Return the index and the first top-level items that differ between
+    two documents, or None if they are equal."""
+    for i, (item_0, item_1) in enumerate(zip_longest(doc_0.items(),
+                                                     doc_1.items())):
+        if item_0 != item_1:
+            return i, item_0, item_1
+    return None
+
+
+# Templates of the elements created in bulk.
+_SPAN = Span()
+_LINE_BREAK = LineBreak()
+_SPACES = {}
+
+
+def _new_element(template):
+    """Return a new empty element like a template, without the grammar
+    checks of the odfpy constructors."""
+    el = Element.__new__(Element)
+    el.__dict__.update(template.__dict__)
+    el.childNodes = []
+    el.attributes = dict(template.attributes)
+    return el
+
+
+def _clone_element(el):
+    """Return a deep copy of an element, detached from its document."""
+    if el.nodeType == el.TEXT_NODE:
+        return Text(el.data)
+    clone = _new_element(el)
+    clone.ownerDocument = None
+    clone.parentNode = clone.previousSibling = clone.nextSibling = None
+    for child in el.childNodes:
+        clone.appendChild(_clone_element(child))
+    return clone
+
+
+def _clone_styles(styles):
+    return {name: _clone_element(style) for name, style in styles.items()}
+
+
+def _new_span(text):
+    el = _new_element(_SPAN)
+    el.appendChild(Text(text))
+    return el
+
+
+def _new_spaces(count):
+    if count not in _SPACES:
+        _SPACES[count] = S(c=count)
+    return _new_element(_SPACES[count])
+
+
+# Leading spaces and runs of spaces in a code line.
+_code_spaces = re.compile(r'(^ +| {2,})')
+
+
 def load_odf(path):
     # HACK: work around a bug in odfpy: make sure the path string is unicode.
     path = text_type(path)
@@ -108,8 +215,141 @@ def load_odf(path):
     return ODFDocument(doc=doc)
 
 
-def save_odf(path, contents):
-    contents.save(path)
+def load_odf_stream(path):
+    return ODFStream(path)
+
+
+def save_odf(path, contents, **kwargs):
+    contents.save(path, **kwargs)
+
+
+# -----------------------------------------------------------------------------
+# Saving
+# -----------------------------------------------------------------------------
+
+_XML_PROLOGUE = u"<?xml version='1.0' encoding='UTF-8'?>\n"
+# Permissions of the files in the archive, as written by odfpy.
+_UNIX_PERMS = 0o100644 << 16
+# Whether the parts can be written directly into the archive.
+_ZIP_STREAMING = sys.version_info >= (3, 6)
+
+
+# Attributes referring to styles, as listed by odfpy.
+_STYLE_REFS = ((CHARTNS, u'style-name'),
+               (DRAWNS, u'style-name'),
+               (DRAWNS, u'text-style-name'),
+               (PRESENTATIONNS, u'style-name'),
+               (STYLENS, u'data-style-name'),
+               (STYLENS, u'list-style-name'),
+               (STYLENS, u'page-layout-name'),
+               (STYLENS, u'style-name'),
+               (TABLENS, u'default-cell-style-name'),
+               (TABLENS, u'style-name'),
+               (TEXTNS, u'style-name'))
+
+
+def _used_auto_styles(doc, segments):
+    """Return the automatic styles used in parts of an odfpy document, like
+    `OpenDocument._used_auto_styles()`, without looking up every style
+    attribute of every element through odfpy."""
+    auto_styles = [el for el in doc.automaticstyles.childNodes
+                   if isinstance(el, Element)]
+    names = set()
+    stack = [el for segment in segments for el in segment.childNodes
+             if el.nodeType == el.ELEMENT_NODE]
+    if stack:
+        # odfpy registers the namespaces of the attributes when it looks
+        # them up, and declares them in the saved parts.
+        for ns, _ in _STYLE_REFS:
+            stack[0].get_nsprefix(ns)
+    if not auto_styles:
+        return []
+    while stack:
+        el = stack.pop()
+        attributes = el.attributes
+        for key in _STYLE_REFS:
+            name = attributes.get(key)
+            if name:
+                names.add(name)
+        stack.extend(child for child in el.childNodes
+                     if child.nodeType == child.ELEMENT_NODE)
+    return [el for el in auto_styles
+            if el.getAttrNS(STYLENS, u'name') in names]
+
+
+def _write_content_xml(doc, f):
+    """Write the content.xml part of an odfpy document, like
+    `OpenDocument.contentxml()`."""
+    f.write(_XML_PROLOGUE)
+    x = DocumentContent()
+    x.write_open_tag(0, f)
+    if doc.scripts.hasChildNodes():
+        doc.scripts.toXml(1, f)
+    if doc.fontfacedecls.hasChildNodes():
+        doc.fontfacedecls.toXml(1, f)
+    a = AutomaticStyles()
+    styles = _used_auto_styles(doc, [doc.styles, doc.automaticstyles,
+                                     doc.body])
+    if styles:
+        a.write_open_tag(1, f)
+        for style in styles:
+            style.toXml(2, f)
+        a.write_close_tag(1, f)
+    else:
+        a.toXml(1, f)
+    doc.body.toXml(1, f)
+    x.write_close_tag(0, f)
+
+
+def _manifest_xml(doc, names):
+    manifest = Manifest()
+    manifest.addElement(FileEntry(fullpath=u'/', mediatype=doc.mimetype))
+    for name in names:
+        manifest.addElement(FileEntry(fullpath=name, mediatype=u'text/xml'))
+    f = io.StringIO()
+    f.write(_XML_PROLOGUE)
+    manifest.toXml(0, f)
+    return f.getvalue()
+
+
+class _ZipWriter(object):
+    """Write the parts of an ODF archive with a given compression level:
+    None for the default level, 0 to store the parts uncompressed."""
+    def __init__(self, path, compresslevel=None):
+        self._zf = zipfile.ZipFile(path, 'w')
+        self._date = time.localtime()[:6]
+        self._compresslevel = compresslevel
+
+    def _info(self, name, stored=False):
+        info = zipfile.ZipInfo(name, self._date)
+        info.external_attr = _UNIX_PERMS
+        if stored or self._compresslevel == 0:
+            info.compress_type = zipfile.ZIP_STORED
+        else:
+            info.compress_type = zipfile.ZIP_DEFLATED
+            # Used by Python 3.7+.
+            info._compresslevel = self._compresslevel
+        return info
+
+    def write(self, name, data, stored=False):
+        """Write a part from bytes or text."""
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
+        self._zf.writestr(self._info(name, stored=stored), data)
+
+    def write_stream(self, name, write):
+        """Write a part with a function writing text into a file."""
+        info = self._info(name)
+        if not _ZIP_STREAMING:  # pragma: no cover
+            f = io.StringIO()
+            write(f)
+            return self.write(name, f.getvalue())
+        with io.TextIOWrapper(self._zf.open(info, 'w'),
+                              encoding='utf-8', newline='') as f:
+            write(f)
+
+    def close(self):
+        self._zf.close()
 
 
 # -----------------------------------------------------------------------------
@@ -163,8 +403,27 @@ def _create_style(name, family=None, **kwargs):
     return style
 
 
+# Styles built once per process: the default styles, and the styles of the
+# template documents keyed by path and modification time. The documents get
+# clones of these styles.
+_default_styles = None
+_template_styles = {}
+
+
+def _cached_default_styles():
+    """Return the default styles built once, not to be modified."""
+    global _default_styles
+    if _default_styles is None:
+        _default_styles = _default_styles_uncached()
+    return _default_styles
+
+
 def default_styles():
     """Generate default ODF styles."""
+    return _clone_styles(_cached_default_styles())
+
+
+def _default_styles_uncached():
 
     styles = {}
 
@@ -275,25 +534,36 @@ def _style_name(el):
     return ''
 
 
+def _load_template_styles(path):
+    """Return the styles of a template document, loaded once until the
+    file changes, not to be modified."""
+    key = (op.realpath(path), os.stat(path).st_mtime)
+    styles = _template_styles.get(key)
+    if styles is None:
+        if len(_template_styles) >= 16:
+            _template_styles.clear()
+        styles = _template_styles[key] = load_styles(load(path))
+    return styles
+
+
 def load_styles(path_or_doc):
     """Return a dictionary of all styles contained in an ODF document."""
     if isinstance(path_or_doc, string_types):
-        doc = load(path_or_doc)
+        return _clone_styles(_load_template_styles(path_or_doc))
+    # Recover the OpenDocumentText instance.
+    if isinstance(path_or_doc, ODFDocument):
+        doc = path_or_doc._doc
     else:
-        # Recover the OpenDocumentText instance.
-        if isinstance(path_or_doc, ODFDocument):
-            doc = path_or_doc._doc
-        else:
-            doc = path_or_doc
-        assert isinstance(doc, OpenDocument), doc
+        doc = path_or_doc
+    assert isinstance(doc, OpenDocument), doc
     styles = {_style_name(style): style for style in doc.styles.childNodes}
     return styles
 
 
 class StyleManager(object):
     def __init__(self, styles=None, mapping=None):
-        self._default = default_styles()
-        self._styles = styles or self._default
+        self._default = _cached_default_styles()
+        self._styles = styles or default_styles()
 
         # Mapping and inverse mapping.
         self._mapping = mapping
@@ -340,8 +610,17 @@ class ODFDocument(object):
         self.add_styles(**self._style_manager.styles)
 
         self._containers = []  # Stack of currently-active containers.
+        self._container_kinds = []  # Kinds of the active containers.
+        self._list_item_count = 0  # Number of active list items.
         self._next_p_style = None  # Style of the next paragraph to be created.
         self._ordered = False  # Where we're currently in an ordered list.
+        self._hash = None  # Structural hash, reset when the text changes.
+
+        # Default save options.
+        self.compresslevel = None
+        self.reuse_parts = False
+        # Parts written by the last save, reset when the styles change.
+        self._saved_parts = {}
 
     # Public methods
     # -------------------------------------------------------------------------
@@ -349,8 +628,50 @@ class ODFDocument(object):
     def show(self):
         _show_element(self._doc.text)
 
-    def save(self, path):
-        self._doc.save(path)
+    def save(self, path, compresslevel=None, reuse_parts=None):
+        """Save the document.
+
+        `compresslevel` is the compression level of the parts, from 0 (not
+        compressed) to 9. With `reuse_parts=True`, the styles and metadata
+        written by the previous save are reused if the styles haven't
+        changed. The defaults are the `compresslevel` and `reuse_parts`
+        attributes.
+
+        """
+        doc = self._doc
+        if compresslevel is None:
+            compresslevel = self.compresslevel
+        if reuse_parts is None:
+            reuse_parts = self.reuse_parts
+        # Documents with other parts are saved by odfpy.
+        if (not isinstance(path, string_types) or path == '-' or
+                doc.Pictures or doc.childobjects or doc._extra or
+                doc.thumbnail is not None):
+            doc.save(path)
+            return
+        parts = self._saved_parts if reuse_parts else {}
+        if 'styles.xml' not in parts:
+            parts['styles.xml'] = doc.stylesxml().encode('utf-8')
+        if doc.settings.hasChildNodes() and 'settings.xml' not in parts:
+            parts['settings.xml'] = doc.settingsxml().encode('utf-8')
+        if 'meta.xml' not in parts:
+            parts['meta.xml'] = doc.metaxml().encode('utf-8')
+        names = ['styles.xml', 'content.xml'] + (
+            ['settings.xml'] if 'settings.xml' in parts else []) + [
+            'meta.xml']
+        zw = _ZipWriter(path, compresslevel=compresslevel)
+        try:
+            zw.write('mimetype', doc.mimetype, stored=True)
+            for name in names:
+                if name == 'content.xml':
+                    zw.write_stream(name, lambda f: _write_content_xml(doc, f))
+                else:
+                    zw.write(name, parts[name])
+            zw.write('META-INF/manifest.xml', _manifest_xml(doc, names))
+        finally:
+            zw.close()
+        if reuse_parts:
+            self._saved_parts = parts
 
     # Style methods
     # -------------------------------------------------------------------------
@@ -359,6 +680,7 @@ class ODFDocument(object):
         """Add ODF styles to the current document."""
         for stylename in sorted(styles):
             self._doc.styles.addElement(styles[stylename])
+        self._saved_parts = {}
 
     def _get_style_name(self, name):
         """Return a style from its default or actual name."""
@@ -371,6 +693,19 @@ class ODFDocument(object):
     def show_styles(self):
         pprint(self.styles)
 
+    def items(self):
+        """Iterate over the top-level items of `tree()`, building them one
+        by one."""
+        return _iter_merged_text(self.tree(child)
+                                 for child in self._doc.text.childNodes
+                                 if not _is_empty(child))
+
+    def structural_hash(self):
+        """Return a hash of `tree()`, computed item by item."""
+        if self._hash is None:
+            self._hash = _items_hash(self.items())
+        return self._hash
+
     def tree(self, el=None):
         item = {}
         # Name.
@@ -401,7 +736,10 @@ class ODFDocument(object):
         return item
 
     def __eq__(self, other):
-        return self.tree() == other.tree()
+        return self.structural_hash() == other.structural_hash()
+
+    def __ne__(self, other):
+        return not self == other
 
     # Internal methods
     # -------------------------------------------------------------------------
@@ -409,8 +747,7 @@ class ODFDocument(object):
     @property
     def _item_level(self):
         """Return the current item level."""
-        return len([c for c in self._containers
-                   if 'list-item' in c.tagName])
+        return self._list_item_count
 
     def _replace_stylename(self, kwargs):
         if 'stylename' in kwargs:
@@ -424,6 +761,7 @@ class ODFDocument(object):
         kwargs = self._replace_stylename(kwargs)
         el = cls(**kwargs)
         self._doc.text.addElement(el)
+        self._hash = None
 
     def _style_name(self, el):
         """Return the style name of an element."""
@@ -452,7 +790,11 @@ class ODFDocument(object):
         kwargs = self._replace_stylename(kwargs)
         # Create the container.
         container = cls(**kwargs)
+        kind = _container_kind(container)
         self._containers.append(container)
+        self._container_kinds.append(kind)
+        if kind == 'list-item':
+            self._list_item_count += 1
 
     def end_container(self, cancel=None):
         """Finishes and registers the currently-active container, unless
@@ -460,12 +802,14 @@ class ODFDocument(object):
         if not self._containers:
             return
         container = self._containers.pop()
-        if len(self._containers) >= 1:
-            parent = self._containers[-1]
-        else:
-            parent = self._doc.text
+        if self._container_kinds.pop() == 'list-item':
+            self._list_item_count -= 1
         if not cancel:
-            parent.addElement(container)
+            if self._containers:
+                _add_to_container(self._containers[-1], container)
+            else:
+                self._doc.text.addElement(container)
+                self._hash = None
 
     @contextmanager
     def container(self, cls, **kwargs):
@@ -482,7 +826,8 @@ class ODFDocument(object):
         self.start_container(P, stylename=stylename)
 
     def is_in_paragraph(self):
-        return self._containers and _is_paragraph(self._containers[-1])
+        return (bool(self._container_kinds) and
+                self._container_kinds[-1] == 'paragraph')
 
     def end_paragraph(self, cancel=None):
         """End the current paragraph."""
@@ -491,7 +836,7 @@ class ODFDocument(object):
     def require_paragraph(self):
         """Create a new paragraph unless the currently-active container
         is already a paragraph."""
-        if self._containers and _is_paragraph(self._containers[-1]):
+        if self.is_in_paragraph():
             return False
         else:
             self.start_paragraph()
@@ -504,36 +849,32 @@ class ODFDocument(object):
         yield
         self.end_paragraph()
 
-    def _code_line(self, line):
-        """Add a code line."""
-        assert self._containers
-        container = self._containers[-1]
-        # Handle extra spaces.
-        text = line
-        while text:
-            if text.startswith('  '):
-                r = re.match(r'(^ +)', text)
-                n = len(r.group(1))
-                container.addElement(S(c=n))
-                text = text[n:]
-            elif '  ' in text:
-                assert not text.startswith(' ')
-                i = text.index('  ')
-                container.addElement(Span(text=text[:i]))
-                text = text[i:]
-            else:
-                container.addElement(Span(text=text))
-                text = ''
+    def _code_line(self, line, preformatted=False):
+        """Return the elements of a code line."""
+        if preformatted or not _code_spaces.search(line):
+            return [_new_span(line)] if line else []
+        # The leading spaces and the runs of spaces are text:s elements,
+        # the rest are spans.
+        tokens = _code_spaces.split(line)
+        return [_new_spaces(len(token)) if i % 2 else _new_span(token)
+                for i, token in enumerate(tokens) if token]
+
+    def code(self, text, lang=None, preformatted=False):
+        """Add a code block.
 
-    def code(self, text, lang=None):
-        """Add a code block."""
+        With `preformatted=True`, every line is a single span: the runs of
+        spaces are kept by ipymd, but collapsed by the office suites.
+
+        """
         # WARNING: lang is discarded currently.
         with self.paragraph(stylename='code'):
-            lines = text.splitlines()
-            for line in lines[:-1]:
-                self._code_line(line)
-                self.linebreak()
-            self._code_line(lines[-1])
+            container = self._containers[-1]
+            for i, line in enumerate(text.splitlines()):
+                if i > 0:
+                    container.addElement(_new_element(_LINE_BREAK),
+                                         check_grammar=False)
+                for el in self._code_line(line, preformatted=preformatted):
+                    container.addElement(el, check_grammar=False)
 
     def set_next_paragraph_style(self, style):
         self._next_p_style = style
@@ -642,6 +983,133 @@ class ODFDocument(object):
         container.addElement(LineBreak())
 
 
+# -----------------------------------------------------------------------------
+# ODF stream
+# -----------------------------------------------------------------------------
+
+_TEXT_TAG = '{%s}text' % OFFICENS
+_P_TAG = '{%s}p' % TEXTNS
+_COUNT_ATTR = '{%s}c' % TEXTNS
+_STYLE_ATTR = '{%s}style-name' % TEXTNS
+
+
+def _element_tag_name(tag):
+    """Return the tag name of an ElementTree tag, as `_tag_name()`."""
+    ns, _, name = tag[1:].partition('}')
+    return (nsdict.get(ns, ns) + ':' + name).replace('text:', '').lower()
+
+
+def _text_item(data):
+    return {'tag': 'text', 'data': data}
+
+
+def _is_empty_element(el):
+    return el.tag == _P_TAG and not el.text and not len(el)
+
+
+def _element_item(el):
+    """Return the item of an element, as `ODFDocument.tree()`."""
+    item = {'tag': _element_tag_name(el.tag)}
+    if item['tag'] == 's':
+        item['count'] = int(el.get(_COUNT_ATTR, 1))
+    # Children.
+    children = [_text_item(el.text)] if el.text else []
+    for child in el:
+        if not _is_empty_element(child):
+            children.append(_element_item(child))
+        if child.tail:
+            children.append(_text_item(child.tail))
+    if (len(children) == 1) and (children[0]['tag'] == 'text'):
+        item['text'] = children[0]['data']
+    else:
+        item['children'] = _merge_text(*children)
+    # Style.
+    item['style'] = el.get(_STYLE_ATTR)
+    # Remove empty fields.
+    return {k: v for k, v in item.items() if v}
+
+
+class ODFStream(object):
+    """ODF document read lazily from a file.
+
+    `items()` parses the text of the document incrementally and yields the
+    top-level items of `ODFDocument.tree()` one by one, without loading the
+    document with odfpy.
+
+    """
+    def __init__(self, path):
+        self.path = path
+        self._hash = None
+        self._hash_key = None
+
+    def _items(self):
+        with zipfile.ZipFile(self.path) as zf:
+            with zf.open('content.xml') as f:
+                body = previous = None
+                depth = 0
+                for event, el in iterparse(f, events=('start', 'end')):
+                    if body is None:
+                        if event == 'start' and el.tag == _TEXT_TAG:
+                            body = el
+                        continue
+                    if event == 'start':
+                        depth += 1
+                        if depth > 1:
+                            continue
+                    elif depth > 0:
+                        depth -= 1
+                        if depth > 0:
+                            continue
+                        # End of a top-level element.
+                        if not _is_empty_element(el):
+                            yield _element_item(el)
+                        previous = el
+                        continue
+                    # Start of a top-level element, or end of the body: the
+                    # text before is now known.
+                    text = body.text if previous is None else previous.tail
+                    if text:
+                        yield _text_item(text)
+                    if previous is not None:
+                        # Free the parsed elements.
+                        body.remove(previous)
+                        previous.clear()
+                        previous = None
+                    else:
+                        body.text = None
+                    if event == 'end':
+                        return
+
+    def items(self):
+        """Iterate over the top-level items of the document."""
+        return _iter_merged_text(self._items())
+
+    def structural_hash(self):
+        """Return a hash of `tree()`, computed while the file is parsed,
+        and cached until the file changes."""
+        stat = os.stat(self.path)
+        key = (stat.st_mtime, stat.st_size)
+        if self._hash_key != key:
+            self._hash = _items_hash(self.items())
+            self._hash_key = key
+        return self._hash
+
+    def tree(self):
+        item = {'tag': 'root'}
+        children = list(self.items())
+        if (len(children) == 1) and (children[0]['tag'] == 'text'):
+            item['text'] = children[0]['data']
+        else:
+            item['children'] = children
+        return {k: v for k, v in item.items() if v}
+
+    def __eq__(self, other):
+        return self.structural_hash() == other.structural_hash()
+
+    def __ne__(self, other):
+        return not self == other
+
+
 # -----------------------------------------------------------------------------
 # Renderers
 # -----------------------------------------------------------------------------
@@ -773,11 +1241,8 @@ class BaseODFReader(BaseRenderer):
     """Parse an ODF document."""
     def read(self, doc):
         # tag, style, children, text
-        assert isinstance(doc, ODFDocument)
         self._doc = doc
-        self._dict = doc.tree()
-        assert self._dict['tag'] == 'root'
-        for child in self._dict['children']:
+        for child in doc.items():
             self._read_item(child)
 
     def _process_children(self, item):
@@ -8,7 +8,8 @@
 
 import re
 
-from ..base_lexer import BaseLexer, BaseGrammar
+from ..base_lexer import (BaseLexer, BaseGrammar, LazyPattern,
+                          _strip_start_anchors, _match_at)
 
 
 # -----------------------------------------------------------------------------
@@ -37,3 +38,39 @@ def test_base_lexer():
     text = "hello world"
     lexer.read(text)
     assert lexer.words == ['hello', 'world']
+
+
+def test_lazy_pattern():
+    class LazyGrammar(BaseGrammar):
+        word = LazyPattern(r'^\w+')
+
+    g0, g1 = LazyGrammar(), LazyGrammar()
+    assert LazyGrammar.__dict__['word']._regex is None
+    assert g0.word.match('hello').group(0) == 'hello'
+    # The compiled regex is shared across instances.
+    assert g0.word is g1.word
+    # The pattern can be overriden on a given instance.
+    g1.word = re.compile(r'^\s+')
+    assert g0.word is not g1.word
+
+
+def test_strip_start_anchors():
+    assert _strip_start_anchors(r'^a|^b') == r'a|b'
+    assert _strip_start_anchors(r'(^|\n\n)a') == r'(|\n\n)a'
+    assert _strip_start_anchors(r'^[^^a]\^') == r'[^^a]\^'
+    # These patterns depend on what precedes the match position.
+    assert _strip_start_anchors(r'a^b') is None
+    assert _strip_start_anchors(r'^\bword') is None
+    assert _strip_start_anchors(r'^(?<=a)b') is None
+
+
+def test_match_at():
+    text = 'ab\nab'
+    for pattern in (r'^ab', r'^b', r'(^|\n)a', r'^\ba'):
+        regex = re.compile(pattern)
+        for pos in range(len(text)):
+            m = _match_at(regex, text, pos)
+            expected = regex.match(text[pos:])
+            assert bool(m) == bool(expected)
+            if m:
+                assert m.group(0) == expected.group(0)
@@ -9,7 +9,7 @@
 import re
 from pprint import pprint
 
-from ..base_lexer import BaseRenderer
+from ..base_lexer import BaseLexer, BaseRenderer
 from ..markdown import BlockLexer, InlineLexer, MarkdownWriter
 from ...utils.utils import _show_outputs
 
@@ -159,6 +159,137 @@ def test_block_lexer_list():
     assert renderer.output == expected
 
 
+def test_block_lexer_table():
+    tables = []
+
+    class TableRenderer(BlockRenderer):
+        def table(self, item):
+            tables.append(item)
+
+    text = "| a | b | c | d |\n|:--|:-:|--:|---|\n| 1 | 2 | 3 | 4 |\n"
+    lexer = BlockLexer(renderer=TableRenderer())
+    lexer.read(text)
+    assert tables == [{'type': 'table',
+                       'header': ['a', 'b', 'c', 'd'],
+                       'align': ['left', 'center', 'right', None],
+                       'cells': [['1', '2', '3', '4']],
+                       }]
+
+
+def test_block_lexer_prune_rules():
+    lexer = BlockLexer(renderer=BlockRenderer())
+    pruned = lexer._prescan(_TEST_TEXT)
+    assert 'table' in pruned
+    assert 'block_html' in pruned
+    assert 'def_footnotes' in pruned
+    assert 'list_block' not in pruned
+    assert 'fences' not in pruned
+
+    outputs = []
+    for prune_rules in (True, False):
+        renderer = BlockRenderer()
+        lexer = BlockLexer(renderer=renderer, prune_rules=prune_rules)
+        lexer.read(_TEST_TEXT)
+        outputs.append(renderer.output)
+    assert outputs[0] == outputs[1]
+
+
+def test_block_lexer_document():
+    renderer = BlockRenderer()
+    lexer = BlockLexer(renderer=renderer)
+    text = "[^1]: Note.\n\n[a]: http://a.com\n"
+
+    with lexer.document():
+        lexer.read(text)
+        assert list(lexer.def_footnotes) == ['1']
+        assert list(lexer.def_links) == ['a']
+    assert not lexer.def_footnotes
+    assert not lexer.def_links
+
+    # The footnote is rendered again in a new document.
+    with lexer.document():
+        lexer.read(text)
+    assert renderer.output.count('Note.') == 2
+
+
+def test_block_lexer_max_defs():
+    lexer = BlockLexer(renderer=BlockRenderer(),
+                       max_def_links=2, max_def_footnotes=1)
+    lexer.read("[a]: http://a.com\n[b]: http://b.com\n[c]: http://c.com\n\n"
+               "[^1]: One.\n\n[^2]: Two.\n")
+    assert list(lexer.def_links) == ['b', 'c']
+    assert list(lexer.def_footnotes) == ['2']
+
+
+# Inputs on which a backtracking pattern or the lexer loop would take
+# quadratic time.
+_PATHOLOGICAL = {
+    'fence_whitespace': '```\nx' + ' ' * 20000 + '\nyy',
+    'unclosed_fences': '\n\n'.join('```' + str(i) for i in range(2000)),
+    'unclosed_html': '\n'.join('<div>' for i in range(5000)),
+    'list_whitespace': '* a' + ' \n' * 10000 + 'x',
+    'code_whitespace': 'x `' + ' ' * 20000 + 'x',
+    'linebreak_whitespace': 'x' + '  \n' * 10000 + 'x',
+    'many_blocks': 'a\n\n' * 10000,
+}
+
+
+class _CountingLexer(BaseLexer):
+    """Count the attempts to match every rule pattern."""
+    def match_rule(self, key, text, pos=0):
+        self.attempts[key] = self.attempts.get(key, 0) + 1
+        return super(_CountingLexer, self).match_rule(key, text, pos)
+
+
+class CountingBlockLexer(BlockLexer, _CountingLexer):
+    def __init__(self, **kwargs):
+        super(CountingBlockLexer, self).__init__(**kwargs)
+        self.attempts = {}
+
+
+def test_block_lexer_pathological():
+    # The running times are measured in benchmarks/bench_redos.py.
+    for name, text in sorted(_PATHOLOGICAL.items()):
+        renderer = BlockRenderer()
+        BlockLexer(renderer=renderer).read(text)
+        assert renderer.output, name
+        renderer = InlineRenderer()
+        InlineLexer(renderer=renderer).read(text)
+        assert renderer.output, name
+
+
+def test_block_lexer_unclosed_fences():
+    # The closing of the fences is searched for once. The last fence has
+    # no line ending, so it does not open a block and is not guarded.
+    renderer = BlockRenderer()
+    lexer = CountingBlockLexer(renderer=renderer)
+    lexer.read(_PATHOLOGICAL['unclosed_fences'])
+    assert lexer.attempts['fences'] == 2
+    assert lexer.attempts['fences_open'] == 2000
+    assert '<code>' not in renderer.output
+
+    # Invalid openings do not prevent the next fences from matching.
+    for opening in ('``` not a fence', '```{r, echo=FALSE}'):
+        renderer = BlockRenderer()
+        lexer = CountingBlockLexer(renderer=renderer)
+        lexer.read('Some text:\n\n' + opening + '\n\n'
+                   '```python\nprint(1)\n```\n\n' + opening + '\n')
+        assert renderer.output.count('<code>') == 1
+        assert 'print(1)' in renderer.output
+
+
+def test_block_lexer_max_depth():
+    renderer = BlockRenderer()
+    lexer = BlockLexer(renderer=renderer, max_depth=2)
+    lexer.read('>' * 5000 + ' x')
+    assert renderer.output.count('<quote>') == 2
+
+    renderer = BlockRenderer()
+    lexer = BlockLexer(renderer=renderer)
+    lexer.read('- ' * 5000)
+    assert renderer.output.count('<ul>') == 32
+
+
 def test_meta_split():
     renderer = BlockRenderer()
     text = "---"
@@ -7,12 +7,24 @@
 # Imports
 # -----------------------------------------------------------------------------
 
+import io
+import os.path as op
+import zipfile
+
 from ..base_lexer import BaseRenderer
 from ..markdown import BlockLexer
-from ..opendocument import (ODFDocument, ODFRenderer, BaseODFReader,
+from odf.text import P
+
+from ..opendocument import (ODFDocument, ODFStream, ODFRenderer,
+                            BaseODFReader,
                             odf_to_markdown,
                             markdown_to_odf,
-                            _merge_text)
+                            default_styles,
+                            load_odf,
+                            load_styles,
+                            _merge_text,
+                            _first_difference)
+from ...utils.tempdir import TemporaryDirectory
 from ...utils.utils import _show_outputs
 
 
@@ -119,6 +131,128 @@ def test_odf_document():
     doc.show_styles()
 
 
+def test_odf_stream():
+    doc = _example_opendocument()
+    with TemporaryDirectory() as tempdir:
+        path = op.join(tempdir, 'example.odt')
+        doc.save(path)
+        stream = ODFStream(path)
+        assert stream.tree() == doc.tree() == load_odf(path).tree()
+        assert odf_to_markdown(stream) == odf_to_markdown(doc)
+
+
+def _xml(el):
+    f = io.StringIO()
+    el.toXml(0, f)
+    return f.getvalue()
+
+
+def test_odf_styles():
+    styles_0 = default_styles()
+    styles_1 = default_styles()
+    assert sorted(styles_0) == sorted(styles_1)
+    # The styles are new elements for every document.
+    assert styles_0['code'] is not styles_1['code']
+    assert _xml(styles_0['code']) == _xml(styles_1['code'])
+
+    with TemporaryDirectory() as tempdir:
+        path = op.join(tempdir, 'template.odt')
+        _example_opendocument().save(path)
+        styles_0 = load_styles(path)
+        styles_1 = load_styles(path)
+        assert styles_0['code'] is not styles_1['code']
+        assert ODFDocument(styles=styles_0).styles is styles_0
+
+
+def test_odf_save():
+    doc = _example_opendocument()
+    with TemporaryDirectory() as tempdir:
+        path = op.join(tempdir, 'example.odt')
+        for compresslevel in (None, 0, 1, 9):
+            doc.save(path, compresslevel=compresslevel)
+            with zipfile.ZipFile(path) as zf:
+                assert zf.namelist()[:1] == ['mimetype']
+                stored = [info.compress_type == zipfile.ZIP_STORED
+                          for info in zf.infolist()]
+            assert all(stored) == (compresslevel == 0)
+            assert load_odf(path) == doc
+
+        # The styles and metadata are reused until the styles change.
+        doc.reuse_parts = True
+        doc.save(path)
+        parts = doc._saved_parts
+        doc.save(path)
+        assert doc._saved_parts is parts
+        doc.add_styles()
+        assert doc._saved_parts == {}
+        doc.save(path)
+        assert load_odf(path) == doc
+
+
+def test_odf_structural_hash():
+    doc_0 = _example_opendocument()
+    doc_1 = _example_opendocument()
+    assert doc_0.structural_hash() == doc_1.structural_hash()
+    assert doc_0 == doc_1
+    assert _first_difference(doc_0, doc_1) is None
+
+    # The hash is updated when the document changes.
+    with doc_1.paragraph():
+        doc_1.text('More text.')
+    assert doc_0 != doc_1
+    i, item_0, item_1 = _first_difference(doc_0, doc_1)
+    assert item_0 is None
+    assert item_1['children'] == [{'tag': 'span', 'text': 'More text.'}]
+
+
+def test_odf_containers():
+    doc = ODFDocument()
+    assert not doc.is_in_paragraph()
+    with doc.list():
+        with doc.list_item():
+            assert doc.require_paragraph()
+            assert doc.is_in_paragraph()
+            assert not doc.require_paragraph()
+            doc.text('Item')
+            doc.end_paragraph()
+            assert doc._item_level == 1
+            with doc.numbered_list():
+                assert doc.next_paragraph_style() == 'sublist-paragraph'
+                with doc.list_item():
+                    assert doc._item_level == 2
+                    with doc.paragraph():
+                        doc.text('Subitem')
+        assert doc._item_level == 0
+    assert doc.tree()['children'][0]['tag'] == 'list'
+    # The elements are registered in the document once it contains them.
+    assert all(el.ownerDocument is doc._doc
+               for el in doc._doc.getElementsByType(P))
+
+
+def test_odf_code():
+    doc = ODFDocument()
+    doc.code('  a  b \n\n c')
+    assert doc.tree()['children'][0]['children'] == [
+        {'tag': 's', 'count': 2},
+        {'tag': 'span', 'text': 'a'},
+        {'tag': 's', 'count': 2},
+        {'tag': 'span', 'text': 'b '},
+        {'tag': 'line-break'},
+        {'tag': 'line-break'},
+        {'tag': 's', 'count': 1},
+        {'tag': 'span', 'text': 'c'},
+    ]
+
+    doc = ODFDocument()
+    doc.code('  a  b \n\n c', preformatted=True)
+    assert doc.tree()['children'][0]['children'] == [
+        {'tag': 'span', 'text': '  a  b '},
+        {'tag': 'line-break'},
+        {'tag': 'line-break'},
+        {'tag': 'span', 'text': ' c'},
+    ]
+
+
 def test_odf_renderer():
     doc = ODFDocument()
     renderer = ODFRenderer(doc)
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""Store of the output assets.
+
+The image and HTML outputs of the code cells are saved in a directory,
+in files named by the hash of their contents. Identical outputs are saved
+once, even across notebooks sharing the same directory.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+import base64
+import hashlib
+import io
+import os
+import os.path as op
+import re
+
+from ..ext.six import string_types
+from .utils import _ensure_string
+
+
+#------------------------------------------------------------------------------
+# Asset store
+#------------------------------------------------------------------------------
+
+# File extension and whether the data is base64-encoded in the notebooks,
+# for the MIME types saved as assets, by order of preference.
+_ASSET_TYPES = [('image/png', '.png', True),
+                ('image/jpeg', '.jpg', True),
+                ('image/gif', '.gif', True),
+                ('image/svg+xml', '.svg', False),
+                ('text/html', '.html', False),
+                ]
+
+ASSET_MIMETYPES = tuple(mimetype for mimetype, _, _ in _ASSET_TYPES)
+
+_extensions = {mimetype: (extension, binary)
+               for mimetype, extension, binary in _ASSET_TYPES}
+_mimetypes = {extension: (mimetype, binary)
+              for mimetype, extension, binary in _ASSET_TYPES}
+
+_asset_name = re.compile(r'^[0-9a-f]{16}(\.[a-z]+)$')
+
+
+def asset_mimetype(name):
+    """Return the MIME type of an asset from its name, or None."""
+    m = _asset_name.match(name)
+    if m is None or m.group(1) not in _mimetypes:
+        return None
+    return _mimetypes[m.group(1)][0]
+
+
+class AssetStore(object):
+    """Directory of output assets, named by the hash of their contents.
+
+    `url` is the prefix of the asset references in the documents, by
+    default the path of the directory.
+
+    """
+    def __init__(self, path, url=None):
+        self.path = path
+        self._url = (path if url is None else url).replace(os.sep, '/')
+
+    def _path(self, name):
+        return op.join(self.path, name)
+
+    def exists(self, name):
+        return (asset_mimetype(name) is not None and
+                op.exists(self._path(name)))
+
+    def put(self, mimetype, data):
+        """Save the data of an output, as found in a notebook, and return
+        the name of the asset."""
+        extension, binary = _extensions[mimetype]
+        data = _ensure_string(data)
+        if binary:
+            contents = base64.b64decode(data.encode('ascii'))
+        else:
+            contents = data.encode('utf-8')
+        name = hashlib.sha1(contents).hexdigest()[:16] + extension
+        path = self._path(name)
+        if not op.exists(path):
+            if not op.isdir(self.path):
+                os.makedirs(self.path)
+            with io.open(path, 'wb') as f:
+                f.write(contents)
+        return name
+
+    def get(self, name):
+        """Return the MIME type and the data of an asset, encoded as in
+        a notebook."""
+        mimetype = asset_mimetype(name)
+        if mimetype is None:
+            raise ValueError("Invalid asset name: {0:s}.".format(name))
+        with io.open(self._path(name), 'rb') as f:
+            contents = f.read()
+        if _extensions[mimetype][1]:
+            return mimetype, base64.b64encode(contents).decode('ascii')
+        return mimetype, contents.decode('utf-8')
+
+    def url(self, name):
+        """Return the reference to an asset in a document."""
+        return self._url.rstrip('/') + '/' + name if self._url else name
+
+    def name(self, url):
+        """Return the name of the asset referenced by a URL, or None if
+        there is no such asset in the store."""
+        name = url.rsplit('/', 1)[-1]
+        return name if self.exists(name) else None
+
+
+def _asset_store(store):
+    """Return an AssetStore from a store, a directory path, or None."""
+    if isinstance(store, string_types):
+        return AssetStore(store)
+    return store
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+
+"""Synthetic notebooks.
+
+Random notebooks of any size, with controllable proportions of code cells,
+outputs, metadata, tables, lists, HTML blocks and math, to profile the
+readers and writers and measure how they scale without shipping large
+files. The same parameters and seed always generate the same cells.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+import os
+import os.path as op
+import random
+
+from ..core.format_manager import format_manager, convert
+
+
+#------------------------------------------------------------------------------
+# Cell generator
+#------------------------------------------------------------------------------
+
+_WORDS = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do '
+          'eiusmod tempor incididunt ut labore et dolore magna aliqua data '
+          'array model value result function parameter notebook kernel '
+          'output sample mean variance signal matrix vector plot').split()
+
+_FUNCTIONS = ('np.sum', 'np.mean', 'np.dot', 'load_data', 'fit', 'plot',
+              'transform', 'len', 'sorted', 'print')
+
+_SLIDE_TYPES = ('slide', 'subslide', 'fragment', 'skip', 'notes')
+
+# Number of distinct output lines of a corpus: the outputs are built from
+# them, which keeps the generation of huge corpora fast.
+_OUTPUT_LINES = 256
+
+
+class _CellGenerator(object):
+    def __init__(self, code_ratio=.5, output_size=200, metadata=.1,
+                 tables=.1, lists=.2, html=.05, math=.1, seed=0):
+        self.code_ratio = code_ratio
+        self.output_size = output_size
+        self.metadata = metadata
+        self.tables = tables
+        self.lists = lists
+        self.html = html
+        self.math = math
+        self._rng = random.Random(seed)
+        self._output_lines = [self._output_line()
+                              for _ in range(_OUTPUT_LINES)]
+
+    def _words(self, n):
+        choice = self._rng.choice
+        return [choice(_WORDS) for _ in range(n)]
+
+    # Markdown
+    # -------------------------------------------------------------------------
+
+    def _word(self, word):
+        """Return a word, sometimes with inline markup."""
+        r = self._rng.random()
+        if r < .03:
+            return '*{0}*'.format(word)
+        elif r < .05:
+            return '**{0}**'.format(word)
+        elif r < .07:
+            return '`{0}`'.format(word)
+        elif r < .08:
+            return '[{0}](http://example.com/{0})'.format(word)
+        elif r < .08 + .05 * self.math:
+            return '${0}_{{{1}}}$'.format(word[0], self._rng.randint(0, 9))
+        return word
+
+    def _sentence(self):
+        words = [self._word(word)
+                 for word in self._words(self._rng.randint(4, 16))]
+        words[0] = words[0].capitalize()
+        return ' '.join(words) + '.'
+
+    def _paragraph(self):
+        return ' '.join(self._sentence()
+                        for _ in range(self._rng.randint(1, 5)))
+
+    def _header(self):
+        return '{0} {1}'.format('#' * self._rng.randint(1, 3),
+                                ' '.join(self._words(3)).capitalize())
+
+    def _table(self):
+        n_columns = self._rng.randint(2, 5)
+        rows = [self._words(n_columns)]
+        rows.append(['---'] * n_columns)
+        for _ in range(self._rng.randint(1, 8)):
+            rows.append(['{0:.3f}'.format(self._rng.random())
+                         for _ in range(n_columns)])
+        return '\n'.join('| ' + ' | '.join(row) + ' |' for row in rows)
+
+    def _list(self):
+        lines = []
+        ordered = self._rng.random() < .5
+        for i in range(self._rng.randint(2, 6)):
+            bullet = '{0}.'.format(i + 1) if ordered else '*'
+            lines.append('{0} {1}'.format(bullet, self._sentence()))
+            if self._rng.random() < .3:
+                lines.append('    * {0}'.format(self._sentence()))
+        return '\n'.join(lines)
+
+    def _html(self):
+        return ('<div class="note">\n<p>{0}</p>\n</div>'.format(
+                self._sentence()))
+
+    def _math(self):
+        return ('$$\n\\sum_{{i=0}}^{{{0}}} {1}_i^2 = \\frac{{{2}}}{{{3}}}'
+                '\n$$'.format(self._rng.randint(1, 100),
+                              self._rng.choice('xyz'),
+                              self._rng.randint(1, 9),
+                              self._rng.randint(1, 9)))
+
+    def _markdown_cell(self):
+        blocks = []
+        if self._rng.random() < .3:
+            blocks.append(self._header())
+        blocks.append(self._paragraph())
+        for probability, block in ((self.lists, self._list),
+                                   (self.tables, self._table),
+                                   (self.math, self._math),
+                                   (self.html, self._html)):
+            if self._rng.random() < probability:
+                blocks.append(block())
+                blocks.append(self._paragraph())
+        return {'cell_type': 'markdown',
+                'source': '\n\n'.join(blocks)}
+
+    # Code
+    # -------------------------------------------------------------------------
+
+    def _statement(self):
+        return '{0} = {1}({2}, {3})'.format(self._rng.choice(_WORDS),
+                                            self._rng.choice(_FUNCTIONS),
+                                            self._rng.choice(_WORDS),
+                                            self._rng.randint(0, 100))
+
+    def _input(self):
+        lines = []
+        if self._rng.random() < .2:
+            lines.append('# {0}'.format(self._sentence()))
+        if self._rng.random() < .3:
+            lines.append('def {0}({1}):'.format(self._rng.choice(_WORDS),
+                                                self._rng.choice(_WORDS)))
+            lines.extend('    ' + self._statement()
+                         for _ in range(self._rng.randint(1, 4)))
+            lines.append('')
+        lines.extend(self._statement()
+                     for _ in range(self._rng.randint(1, 6)))
+        return '\n'.join(lines)
+
+    def _output_line(self):
+        return ' '.join('{0:.4f}'.format(self._rng.random())
+                        for _ in range(self._rng.randint(1, 10)))
+
+    def _output(self):
+        """Return an output of about `output_size` characters on average."""
+        if self.output_size <= 0:
+            return None
+        size = int(self.output_size * 2 * self._rng.random())
+        lines = []
+        choice = self._rng.choice
+        while size > 0:
+            line = choice(self._output_lines)
+            lines.append(line)
+            size -= len(line) + 1
+        return '\n'.join(lines) or None
+
+    def _code_cell(self):
+        return {'cell_type': 'code',
+                'input': self._input(),
+                'output': self._output()}
+
+    # Cells
+    # -------------------------------------------------------------------------
+
+    def _metadata(self, i):
+        metadata = {'corpus': {'index': i}}
+        if self._rng.random() < .5:
+            metadata['tags'] = self._rng.sample(_WORDS,
+                                                self._rng.randint(1, 3))
+        if self._rng.random() < .5:
+            metadata['slideshow'] = {
+                'slide_type': self._rng.choice(_SLIDE_TYPES)}
+        return metadata
+
+    def cell(self, i):
+        if self._rng.random() < self.code_ratio:
+            cell = self._code_cell()
+        else:
+            cell = self._markdown_cell()
+        if self._rng.random() < self.metadata:
+            cell['metadata'] = self._metadata(i)
+        return cell
+
+
+def _cell_size(cell):
+    if cell['cell_type'] == 'markdown':
+        return len(cell['source'])
+    return len(cell['input']) + len(cell['output'] or '')
+
+
+#------------------------------------------------------------------------------
+# Corpus
+#------------------------------------------------------------------------------
+
+def iter_cells(n_cells=100, size=None, code_ratio=.5, output_size=200,
+               metadata=.1, tables=.1, lists=.2, html=.05, math=.1, seed=0):
+    """Generate random ipymd cells.
+
+    Parameters
+    ----------
+
+    n_cells : int
+        Number of cells, unless `size` is specified.
+    size : int or None
+        Total number of characters of the cells, to generate documents of
+        a given size. The generation stops after the cell exceeding it.
+    code_ratio : float
+        Proportion of code cells.
+    output_size : int
+        Average number of characters of the outputs. The code cells have
+        no output if it is 0.
+    metadata : float
+        Proportion of cells with metadata.
+    tables, lists, html, math : float
+        Probability of a Markdown cell to contain each kind of block.
+        Inline math is also more frequent with `math`.
+    seed : int
+        Seed of the random generator.
+
+    """
+    generator = _CellGenerator(code_ratio=code_ratio,
+                               output_size=output_size,
+                               metadata=metadata,
+                               tables=tables,
+                               lists=lists,
+                               html=html,
+                               math=math,
+                               seed=seed)
+    i = 0
+    total = 0
+    while (total < size) if size is not None else (i < n_cells):
+        cell = generator.cell(i)
+        total += _cell_size(cell)
+        i += 1
+        yield cell
+
+
+def generate_cells(*args, **kwargs):
+    """Return a list of random ipymd cells. The parameters are those of
+    `iter_cells()`."""
+    return list(iter_cells(*args, **kwargs))
+
+
+def save_corpus(dirpath, formats=None, name='corpus', **kwargs):
+    """Save the same random cells in every format, or in the specified
+    formats, and return the paths of the files by format.
+
+    The files are named like `corpus.markdown.md`. The other keyword
+    arguments are those of `iter_cells()`.
+
+    """
+    manager = format_manager()
+    formats = formats or manager.formats
+    if not op.isdir(dirpath):
+        os.makedirs(dirpath)
+    paths = {}
+    for format in formats:
+        # The writers modify the cells.
+        contents = convert(generate_cells(**kwargs), to=format)
+        path = op.join(dirpath, '{0}.{1}{2}'.format(
+                       name, format, manager.file_extension(format)))
+        manager.save(path, contents, name=format, overwrite=True)
+        paths[format] = path
+    return paths
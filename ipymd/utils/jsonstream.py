@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+
+"""Incremental JSON reader.
+
+The document is read chunk by chunk, and the caller walks through it
+value by value: only the values that are read are decoded into Python
+objects, the skipped ones are only scanned.
+
+"""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+import io
+import json
+import re
+
+from ..ext.six import string_types
+
+
+#------------------------------------------------------------------------------
+# JSON stream
+#------------------------------------------------------------------------------
+
+_whitespace = re.compile(r'[ \t\n\r]*')
+# End of a number or of a literal.
+_scalar_end = re.compile(r'[ \t\n\r,\]}]')
+# Contents of a container up to the next bracket or incomplete string. The
+# possessive quantifiers (Python 3.11+) avoid the backtracking bookkeeping.
+try:
+    _container_run = re.compile(r'(?:[^"\[\]{}]++|'
+                                r'"[^"\\]*+(?:\\.[^"\\]*+)*+")*+')
+except re.error:  # pragma: no cover
+    _container_run = re.compile(r'(?:[^"\[\]{}]+|'
+                                r'"[^"\\]*(?:\\.[^"\\]*)*")*')
+_decoder = json.JSONDecoder()
+
+
+class JSONStream(object):
+    """Read a JSON document incrementally.
+
+    `items()` iterates over the keys of the current object, and `values()`
+    over the elements of the current array. Every key or element must be
+    followed by a call to `read()`, `skip()`, `items()` or `values()` to
+    consume its value; an unconsumed value is skipped. Closing one of these
+    iterators skips the rest of the object or array.
+
+    Example:
+
+        stream = JSONStream(path)
+        for key in stream.items():
+            if key == 'cells':
+                for _ in stream.values():
+                    cell = stream.read()
+            else:
+                stream.skip()
+
+    """
+    def __init__(self, file, chunk_size=1 << 16):
+        if isinstance(file, string_types):
+            file = io.open(file, 'r', encoding='utf-8')
+        self._file = file
+        self._chunk_size = chunk_size
+        self._buf = ''
+        self._pos = 0
+        # Whether the value following a key or an element is unconsumed.
+        self._pending = False
+
+    def close(self):
+        self._file.close()
+
+    # Buffer
+    # -------------------------------------------------------------------------
+
+    def _fill(self, size=None):
+        """Read a new chunk, discarding the consumed characters. Return
+        False at the end of the file."""
+        chunk = self._file.read(size or self._chunk_size)
+        if not chunk:
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _error(self, message):
+        return ValueError(message + ': ' + repr(self._buf[self._pos:
+                                                          self._pos + 20]))
+
+    def _peek(self):
+        """Skip the whitespace and return the next character, or ''."""
+        while True:
+            self._pos = _whitespace.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf) or not self._fill():
+                return self._buf[self._pos:self._pos + 1]
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise self._error("Expecting '%s'" % char)
+        self._pos += 1
+
+    # Tokens
+    # -------------------------------------------------------------------------
+
+    def _string(self, keep):
+        """Scan the string at the current position, and return it if
+        `keep` is True."""
+        parts = []
+        start = self._pos
+        i = start + 1
+        while True:
+            buf = self._buf
+            quote = buf.find('"', i)
+            backslash = buf.find('\\', i, quote if quote >= 0 else len(buf))
+            if backslash < 0 and quote >= 0:
+                self._pos = end = quote + 1
+                if not keep:
+                    return None
+                parts.append(buf[start:end])
+                return json.loads(''.join(parts))
+            if backslash >= 0 and backslash + 1 < len(buf):
+                # Escaped character.
+                i = backslash + 2
+                continue
+            # Read the next chunk, keeping a trailing backslash.
+            i = len(buf) if backslash < 0 else backslash
+            if keep:
+                parts.append(buf[start:i])
+            self._pos = i
+            if not self._fill():
+                raise self._error("Unterminated string")
+            start = i = 0
+
+    def _scalar(self, keep):
+        """Scan the number or literal at the current position."""
+        while True:
+            m = _scalar_end.search(self._buf, self._pos)
+            if m is not None or not self._fill():
+                break
+        end = m.start() if m is not None else len(self._buf)
+        token = self._buf[self._pos:end]
+        if not token:
+            raise self._error("Expecting value")
+        self._pos = end
+        if keep:
+            try:
+                return json.loads(token)
+            except ValueError:
+                raise self._error("Invalid value %s" % repr(token))
+
+    def _decode(self):
+        """Decode the object or array at the current position."""
+        # Find the end of the value, keeping it in the buffer.
+        i = self._pos
+        depth = 0
+        size = self._chunk_size
+        while True:
+            i = _container_run.match(self._buf, i).end()
+            if i == len(self._buf) or self._buf[i] == '"':
+                # Incomplete string or container: read more of the file.
+                offset = self._pos
+                if not self._fill(size):
+                    raise self._error("Unterminated container")
+                i -= offset
+                size *= 2
+                continue
+            char = self._buf[i]
+            i += 1
+            depth += 1 if char in '[{' else -1
+            if depth == 0:
+                break
+        value, self._pos = _decoder.raw_decode(self._buf[:i], self._pos)
+        return value
+
+    def _skip_container(self, depth=0):
+        """Skip the object or array at the current position, or the rest
+        of the current one with `depth=1`."""
+        while True:
+            self._pos = _container_run.match(self._buf, self._pos).end()
+            if self._pos == len(self._buf):
+                if not self._fill():
+                    raise self._error("Unterminated container")
+                continue
+            char = self._buf[self._pos]
+            if char == '"':
+                # String continued in the next chunk.
+                self._string(False)
+                continue
+            self._pos += 1
+            if char in '[{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _consume_pending(self):
+        if self._pending:
+            self._pending = False
+            self.skip()
+
+    def _close_container(self):
+        """Skip the rest of the current object or array."""
+        self._consume_pending()
+        self._skip_container(depth=1)
+
+    # Public methods
+    # -------------------------------------------------------------------------
+
+    def items(self):
+        """Iterate over the keys of the object at the current position."""
+        self._pending = False
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            if self._peek() != '"':
+                raise self._error("Expecting property name")
+            key = self._string(True)
+            self._expect(':')
+            self._pending = True
+            try:
+                yield key
+            except GeneratorExit:
+                self._close_container()
+                raise
+            self._consume_pending()
+            char = self._peek()
+            self._pos += 1
+            if char == '}':
+                return
+            elif char != ',':
+                self._pos -= 1
+                raise self._error("Expecting ',' or '}'")
+
+    def values(self):
+        """Iterate over the elements of the array at the current position.
+
+        Nothing is yielded: the elements are consumed by the caller."""
+        self._pending = False
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            self._pending = True
+            try:
+                yield
+            except GeneratorExit:
+                self._close_container()
+                raise
+            self._consume_pending()
+            char = self._peek()
+            self._pos += 1
+            if char == ']':
+                return
+            elif char != ',':
+                self._pos -= 1
+                raise self._error("Expecting ',' or ']'")
+
+    def peek(self):
+        """Return the first character of the value at the current position:
+        '{', '[', '"', etc."""
+        return self._peek()
+
+    def read(self):
+        """Read the value at the current position."""
+        self._pending = False
+        char = self._peek()
+        if char == '"':
+            return self._string(True)
+        elif char in ('{', '['):
+            return self._decode()
+        return self._scalar(True)
+
+    def skip(self):
+        """Skip the value at the current position without decoding it."""
+        self._pending = False
+        char = self._peek()
+        if char == '"':
+            self._string(False)
+        elif char in ('{', '['):
+            self._skip_container()
+        else:
+            self._scalar(False)
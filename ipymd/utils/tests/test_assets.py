@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+"""Test the asset store."""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+import base64
+import os
+import os.path as op
+
+from pytest import raises
+
+from ..assets import AssetStore, asset_mimetype
+from ..tempdir import TemporaryDirectory
+
+
+#------------------------------------------------------------------------------
+# Tests
+#------------------------------------------------------------------------------
+
+def test_asset_store():
+    png = base64.b64encode(b'\x89PNG\r\n').decode('ascii')
+    with TemporaryDirectory() as tempdir:
+        store = AssetStore(op.join(tempdir, 'assets'), url='assets')
+        name = store.put('image/png', png)
+        assert asset_mimetype(name) == 'image/png'
+        assert store.get(name) == ('image/png', png)
+
+        # Identical outputs are saved once.
+        assert store.put('image/png', [png[:4], png[4:]]) == name
+        html = store.put('text/html', [u'<b>é</b>'])
+        assert store.get(html) == ('text/html', u'<b>é</b>')
+        assert sorted(os.listdir(store.path)) == sorted([name, html])
+
+        assert store.url(name) == 'assets/' + name
+        assert store.name(store.url(name)) == name
+        assert store.name('other/' + html) == html
+        assert store.name('assets/0123456789abcdef.png') is None
+        assert store.name('image.png') is None
+
+        with raises(ValueError):
+            store.get('image.png')
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""Test the synthetic notebooks."""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+import os.path as op
+
+from ..corpus import generate_cells, iter_cells, save_corpus, _cell_size
+from ..tempdir import TemporaryDirectory
+from ...core.format_manager import format_manager
+
+
+#------------------------------------------------------------------------------
+# Tests
+#------------------------------------------------------------------------------
+
+def test_corpus_cells():
+    cells = generate_cells(50, seed=1)
+    assert len(cells) == 50
+    assert generate_cells(50, seed=1) == cells
+    assert generate_cells(50, seed=2) != cells
+
+    # Proportions.
+    assert all(cell['cell_type'] == 'code'
+               for cell in generate_cells(20, code_ratio=1))
+    assert all(cell['cell_type'] == 'markdown'
+               for cell in generate_cells(20, code_ratio=0))
+    assert all(cell['output'] is None
+               for cell in generate_cells(20, code_ratio=1, output_size=0))
+    assert all('metadata' in cell for cell in generate_cells(20, metadata=1))
+    assert not any('metadata' in cell
+                   for cell in generate_cells(20, metadata=0))
+
+    sources = [cell['source']
+               for cell in generate_cells(20, code_ratio=0, tables=1,
+                                          lists=1, html=1, math=1)]
+    assert all('| --- |' in source and '<div' in source and
+               '$$' in source for source in sources)
+
+
+def test_corpus_size():
+    cells = list(iter_cells(size=100000))
+    total = sum(_cell_size(cell) for cell in cells)
+    assert total >= 100000
+    assert total - _cell_size(cells[-1]) < 100000
+
+
+def test_save_corpus():
+    with TemporaryDirectory() as tempdir:
+        paths = save_corpus(tempdir, n_cells=20, metadata=.5)
+        manager = format_manager()
+        assert sorted(paths) == manager.formats
+        for format, path in paths.items():
+            assert op.basename(path) == 'corpus.{0}{1}'.format(
+                format, manager.file_extension(format))
+            assert manager.convert(path, from_=format)
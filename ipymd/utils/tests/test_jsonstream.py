@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""Test the incremental JSON reader."""
+
+#------------------------------------------------------------------------------
+# Imports
+#------------------------------------------------------------------------------
+
+import io
+import json
+
+from pytest import raises
+
+from ..jsonstream import JSONStream
+
+
+#------------------------------------------------------------------------------
+# Tests
+#------------------------------------------------------------------------------
+
+_DOCUMENT = {
+    'a': [1, -2.5e3, True, False, None, u'\\"x\\"', u'é\n '],
+    'b': {'c': {}, 'd': [], 'e': [[], [{}]], 'f': u'[{"}]'},
+    'g': u'x' * 100,
+}
+
+
+def _stream(obj, chunk_size, indent=None):
+    text = json.dumps(obj, indent=indent, sort_keys=True)
+    return JSONStream(io.StringIO(u'' + text), chunk_size=chunk_size)
+
+
+def test_json_stream_read():
+    for chunk_size in (1, 2, 3, 7, 1 << 16):
+        for indent in (None, 2):
+            stream = _stream(_DOCUMENT, chunk_size, indent=indent)
+            assert stream.read() == _DOCUMENT
+
+
+def test_json_stream_walk():
+    for chunk_size in (1, 3, 1 << 16):
+        stream = _stream(_DOCUMENT, chunk_size, indent=1)
+        keys = []
+        for key in stream.items():
+            keys.append(key)
+            if key == 'a':
+                assert [stream.read() for _ in stream.values()] == \
+                    _DOCUMENT['a']
+            elif key == 'b':
+                # The unconsumed values are skipped.
+                assert [k for k in stream.items() if k == 'f'] == ['f']
+            else:
+                stream.skip()
+        assert keys == ['a', 'b', 'g']
+        assert stream._peek() == ''
+
+
+def test_json_stream_errors():
+    for text in ('{"a" 1}', '{"a": "x', '[1 2]', '{"a": [1, 2}', '{1: 2}'):
+        with raises(ValueError):
+            JSONStream(io.StringIO(u'' + text), chunk_size=2).read()
@@ -6,7 +6,14 @@
 # Imports
 #------------------------------------------------------------------------------
 
-from ..utils import _diff
+import json
+import os.path as op
+
+from pytest import raises
+
+from ..tempdir import TemporaryDirectory
+from ..utils import (_diff, _first_line, _preprocess, _json_backend,
+                     _read_json, _write_json)
 
 
 #------------------------------------------------------------------------------
@@ -19,3 +26,49 @@ def test_diff():
 
     assert _diff(s, ' ' + s) == s
     assert _diff(s, s + ' ') == s
+
+
+def test_first_line():
+    assert _first_line('') == ''
+    assert _first_line('abc') == 'abc'
+    assert _first_line('abc\ndef\n') == 'abc'
+    assert _first_line('\nabc') == ''
+    assert _first_line('abc\rdef\nghi') == 'abc'
+
+
+def test_preprocess():
+    # A normalized text is not copied.
+    text = 'a\n\n  b\nc'
+    assert _preprocess(text) is text
+
+    assert _preprocess('a\r\nb\rc\n') == 'a\nb\nc'
+    assert _preprocess('\ta \n   \nb\u00a0\u2424c') == '    a\n\nb\nc'
+    # A last line of spaces is removed.
+    assert _preprocess('a\n\n   ') == 'a\n'
+
+    # Only the line endings.
+    assert _preprocess(text, strip_lines=False) is text
+    assert _preprocess('a \r\nb\r', strip_lines=False) == 'a \nb\n'
+
+
+def test_json_backends():
+    contents = {'b': [1, 2.5, None, True], 'a': {'c': u'é/"x"\n'}, 'd': []}
+    with TemporaryDirectory() as tempdir:
+        path = op.join(tempdir, 'test.json')
+
+        # The standard library backend writes the same files as json.dump.
+        _write_json(path, contents, backend='json')
+        with open(path, 'r') as f:
+            assert f.read() == json.dumps(contents, indent=2, sort_keys=True)
+
+        for backend in ('json', 'orjson', 'ujson', 'auto'):
+            try:
+                _json_backend(backend)
+            except ImportError:
+                continue
+            _write_json(path, contents, backend=backend)
+            assert _read_json(path, backend=backend) == contents
+            assert _read_json(path, backend='json') == contents
+
+    with raises(ValueError):
+        _json_backend('unknown')
@@ -6,6 +6,7 @@
 # Imports
 #------------------------------------------------------------------------------
 
+import io
 import os
 import os.path as op
 import re
@@ -34,16 +35,59 @@ def _ensure_string(source):
         return _rstrip_lines(source)
 
 
-def _preprocess(text, tab=4):
-    """Normalize a text."""
-    text = re.sub(r'\r\n|\r', '\n', text)
-    text = text.replace('\t', ' ' * tab)
-    text = text.replace('\u00a0', ' ')
-    text = text.replace('\u2424', '\n')
-    pattern = re.compile(r'^ +$', re.M)
-    text = pattern.sub('', text)
-    text = _rstrip_lines(text)
-    return text
+def _first_line(text):
+    """Return the first line of a text, without splitting all its lines."""
+    i = text.find('\n')
+    line = text if i < 0 else text[:i]
+    # Other line boundaries, as in `str.splitlines()`.
+    lines = line.splitlines()
+    return lines[0] if lines else ''
+
+
+# Characters replaced by _preprocess(), or splitting lines.
+_preprocess_chars = ('\r', '\t', '\x0b', '\x0c', '\x1c', '\x1d', '\x1e',
+                     '\x85', '\u00a0', '\u2028', '\u2029', '\u2424')
+# The other whitespace characters, stripped at the end of the lines.
+_other_spaces = (' \x1f\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006'
+                 '\u2007\u2008\u2009\u200a\u202f\u205f\u3000')
+
+
+def _is_preprocessed(text):
+    """Return whether _preprocess() leaves a text unchanged."""
+    if text[-1:].isspace():
+        return False
+    if any(char in text for char in _preprocess_chars):
+        return False
+    return not any(char + '\n' in text for char in _other_spaces)
+
+
+def _preprocess(text, tab=4, strip_lines=True):
+    """Normalize a text.
+
+    With `strip_lines=False`, only the line endings are normalized. A text
+    that is already normalized is returned as is.
+
+    """
+    if not strip_lines:
+        if '\r' not in text:
+            return text
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+    if _is_preprocessed(text):
+        return text
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    if '\t' in text:
+        text = text.replace('\t', ' ' * tab)
+    if '\u00a0' in text:
+        text = text.replace('\u00a0', ' ')
+    if '\u2424' in text:
+        text = text.replace('\u2424', '\n')
+    # The lines of spaces are emptied by the stripping of the lines, except
+    # the last one which is removed along with the preceding line break.
+    i = text.rfind('\n') + 1
+    if i < len(text) and not text[i:].strip(' '):
+        text = text[:i]
+    return _rstrip_lines(text)
 
 
 def _remove_output_cell(cell):
@@ -105,20 +149,92 @@ def _show_outputs(*outputs):
         pprint(output)
 
 
+#------------------------------------------------------------------------------
+# JSON backends
+#------------------------------------------------------------------------------
+
+def _stdlib_json():
+    def dumps(contents):
+        return json.dumps(contents, indent=2, sort_keys=True)
+    return json.loads, dumps
+
+
+def _orjson():
+    import orjson
+    option = orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+
+    def dumps(contents):
+        return orjson.dumps(contents, option=option).decode('utf-8')
+    return orjson.loads, dumps
+
+
+def _ujson():
+    import ujson
+
+    def dumps(contents):
+        return ujson.dumps(contents, indent=2, sort_keys=True,
+                           escape_forward_slashes=False)
+    return ujson.loads, dumps
+
+
+# Backends, from the fastest to the slowest.
+_json_backend_factories = (('orjson', _orjson),
+                           ('ujson', _ujson),
+                           ('json', _stdlib_json),
+                           )
+_json_backends = {}
+
+
+def _json_backend(name=None):
+    """Return the `(loads, dumps)` functions of a JSON backend.
+
+    The backend is 'json' (the standard library), 'orjson', 'ujson', or
+    'auto' for the fastest one installed. By default, it is read from the
+    IPYMD_JSON_BACKEND environment variable, and is 'json'.
+
+    Only the 'json' backend writes files byte-identical to the previous
+    versions of ipymd (compatibility mode): the other ones do not escape
+    non-ASCII characters and may format floats differently.
+
+    """
+    if name is None:
+        name = os.environ.get('IPYMD_JSON_BACKEND', 'json')
+    if name not in _json_backends:
+        factories = dict(_json_backend_factories)
+        if name == 'auto':
+            for backend_name, factory in _json_backend_factories:
+                try:
+                    _json_backends[name] = factory()
+                    break
+                except ImportError:
+                    continue
+        elif name in factories:
+            _json_backends[name] = factories[name]()
+        else:
+            raise ValueError("The JSON backend should be one of: " +
+                             ', '.join(sorted(factories)) + ', auto.')
+    return _json_backends[name]
+
+
 #------------------------------------------------------------------------------
 # Reading/writing files from/to disk
 #------------------------------------------------------------------------------
 
-def _read_json(file):
+def _read_json(file, backend=None):
     """Read a JSON file."""
-    with open(file, 'r') as f:
-        return json.load(f)
+    loads, _ = _json_backend(backend)
+    with io.open(file, 'r', encoding='utf-8') as f:
+        return loads(f.read())
 
 
-def _write_json(file, contents):
+def _write_json(file, contents, backend=None):
     """Write a dict to a JSON file."""
-    with open(file, 'w') as f:
-        return json.dump(contents, f, indent=2, sort_keys=True)
+    _, dumps = _json_backend(backend)
+    text = dumps(contents)
+    if isinstance(text, bytes):
+        text = text.decode('utf-8')
+    with io.open(file, 'w', encoding='utf-8') as f:
+        f.write(text)
 
 
 def _read_text(file):